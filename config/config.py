@@ -39,8 +39,9 @@ elif _exchange_name == "BYBIT":
 # 공통 변수와 거래소별 변수를 합쳐 최종 필수 환경 변수 목록을 만듭니다.
 REQUIRED_ENV = _common_required + _exchange_keys
 
-# 필수 변수가 설정되었는지 확인합니다.
-_missing = [key for key in REQUIRED_ENV if not os.getenv(key)]
+# 필수 변수 값을 한 번만 읽어 딕셔너리에 보관하고, 설정되었는지 확인합니다.
+_required_values = {key: os.getenv(key) for key in REQUIRED_ENV}
+_missing = [key for key, value in _required_values.items() if not value]
 if _missing:
     # 누락된 변수가 있으면 프로그램을 종료합니다.
     sys.exit(f"[FATAL] .env 파일에 다음 필수 변수가 설정되지 않았습니다: {_missing}")
@@ -60,9 +61,9 @@ class CFG:
     BYBIT_API_KEY = os.getenv("BYBIT_API_KEY")
     BYBIT_API_SECRET = os.getenv("BYBIT_API_SECRET")
 
-    # 텔레그램 봇 토큰 및 채팅 ID
-    TG_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-    TG_CHAT = os.getenv("TELEGRAM_CHAT_ID")
+    # 텔레그램 봇 토큰 및 채팅 ID (필수 변수 확인 시 읽어 둔 값을 재사용합니다)
+    TG_TOKEN = _required_values["TELEGRAM_BOT_TOKEN"]
+    TG_CHAT = _required_values["TELEGRAM_CHAT_ID"]
 
     # 사용할 거래소 이름. 'BYBIT' 또는 'BINANCE'를 지원합니다.
     EXCHANGE_NAME = _exchange_name
@@ -83,6 +84,8 @@ class CFG:
     # 1회 거래에 사용할 증거금 (USDT 기준). 0보다 크면 이 값을 기준으로 포지션 크기를 계산합니다.
     # (계산식: `(증거금 * 레버리지) / 현재가`)
     MARGIN_PER_TRADE = float(os.getenv("POSITION_MARGIN", 0))
+    # 증거금 기준 포지션 계산에 쓰이는 `증거금 * 레버리지` 값을 미리 계산해 둡니다.
+    MARGIN_X_LEV = MARGIN_PER_TRADE * LEVERAGE
     # 테스트(페이퍼) 모드 활성화 여부. 'true'일 경우 실제 주문 없이 모의 거래를 실행합니다.
     TEST_MODE = os.getenv("TEST_MODE", "true").lower() == "true"
     # 페이퍼 트레이딩 시 사용할 초기 가상 잔고.
@@ -110,6 +113,8 @@ class CFG:
     SLEEP_SEC = int(os.getenv("SLEEP_SEC", 60))
     # 모델을 재학습할 주기 (시간 단위). 이 시간이 지나면 모델을 다시 학습합니다.
     RETRAIN_HR = int(os.getenv("TRAIN_HR", 24))
+    # 재학습 주기를 초 단위로 미리 계산해 둔 값. 메인 루프에서 매번 곱셈을 반복하지 않도록 합니다.
+    RETRAIN_SEC = RETRAIN_HR * 3600
     # 모델의 하이퍼파라미터를 GridSearchCV를 통해 다시 탐색할 주기 (일 단위).
     GRID_DAYS = int(os.getenv("GRIDSEARCH_INTERVAL_DAYS", 7))
 
@@ -120,21 +125,33 @@ class CFG:
     MAX_LOSS = int(os.getenv("MAX_CONSECUTIVE_LOSSES", 3))
     # 연속 손실로 인해 트레이딩이 중단되었을 때, 휴식할 시간 (시간 단위).
     PAUSE_HR = int(os.getenv("PAUSE_HR", 1))
+    # 0으로 나누는 것을 방지하기 위한 최소값.
+    EPS = 1e-6
+
+    # --- 테스트 설정 ---
+    # 'true'이면 step_by_step_test.py가 주문 API를 반복 호출하는 대신 한 번에 상태를 바꾸는 빠른 경로를 사용합니다.
+    FAST_TESTS = os.getenv("FAST_TESTS", "false").lower() == "true"
 
     # --- 경로 설정 ---
-    # OHLCV 데이터 캐시(.parquet 파일)를 저장할 디렉토리 경로.
+    # OHLCV 데이터 캐시(타임프레임별 .parquet 조각 파일 디렉토리)를 저장할 디렉토리 경로.
     DATA_DIR = Path(os.getenv("DATA_DIR", "data"))
-    # 학습된 ML 모델(.joblib 파일)을 저장할 디렉토리 경로.
+    # 학습된 ML 모델(XGBoost UBJ 형식의 .ubj 파일)을 저장할 디렉토리 경로.
     MODEL_DIR = Path(os.getenv("MODEL_DIR", "models"))
     # 거래 심볼에 따라 동적으로 생성되는 모델 파일의 전체 경로.
-    MODEL_FP = MODEL_DIR / f"xgb_{SYMBOL.replace('/', '_')}_fut.joblib"
+    MODEL_FP = MODEL_DIR / f"xgb_{SYMBOL.replace('/', '_')}_fut.ubj"
+
+    # `validate()`가 이미 실행되었는지 나타내는 플래그.
+    _validated = False
 
     @staticmethod
     def validate() -> None:
         """
         클래스에 로드된 설정 값들의 유효성을 검증하고, 필요한 디렉토리를 생성합니다.
-        이 메서드는 모듈이 처음 임포트될 때 단 한 번 호출됩니다.
+        이 메서드는 모듈이 처음 임포트될 때 호출되며, 모듈이 다시 로드되거나 여러 번 호출되더라도
+        검증과 디렉토리 생성은 프로세스당 한 번만 수행됩니다.
         """
+        if CFG._validated:
+            return
         # 포지션 크기를 결정하는 두 가지 방법 중 하나는 반드시 설정되어야 합니다.
         if CFG.POS_SIZE <= 0 and CFG.MARGIN_PER_TRADE <= 0:
             raise ValueError("POSITION_SIZE 또는 POSITION_MARGIN 중 하나는 0보다 커야 합니다.")
@@ -147,6 +164,7 @@ class CFG:
         # `exist_ok=True`는 디렉토리가 이미 존재하더라도 오류를 발생시키지 않습니다.
         CFG.DATA_DIR.mkdir(exist_ok=True)
         CFG.MODEL_DIR.mkdir(exist_ok=True)
+        CFG._validated = True
 
 
 # --- 최초 로드 시 유효성 검증 실행 ---
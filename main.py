@@ -8,20 +8,26 @@
 3. 데이터, 모델, 주문을 처리하는 각 서비스(`IndicatorRepository`, `ModelService`, `OrderService`)를 초기화합니다.
    이때, 앞에서 생성한 거래소 객체를 서비스에 주입(Dependency Injection)합니다.
 4. 모든 서비스를 관장하는 메인 `TradingBot` 객체를 생성합니다.
-5. 봇의 메인 트레이딩 루프(`bot.loop`)를 백그라운드 스레드에서 실행시킵니다.
+5. 봇의 메인 트레이딩 루프(`bot.loop`, asyncio 코루틴)를 백그라운드 스레드의 이벤트 루프에서 실행시킵니다.
 6. Streamlit을 사용하여 사용자 인터페이스(UI) 대시보드를 실행합니다.
 
 `if __name__ == "__main__":` 블록을 사용하여 이 스크립트가 직접 실행될 때만 `main()` 함수가 호출되도록 보장합니다.
 """
+import asyncio
 import threading
+import pandas as pd
 from config.config import CFG
-from src.exchange.binance_futures import BinanceFutures
-from src.exchange.bybit_futures import BybitFutures
+from src.utils.helpers import setup_logging
 from src.data.indicator_repository import IndicatorRepository
 from src.model.model_service import ModelService
 from src.order.order_service import OrderService
 from src.bot.trading_bot import TradingBot
-from src.ui.dashboard import run_dashboard
+
+# --- pandas Copy-on-Write 모드 ---
+# `df.tail(n)`, 컬럼 선택 등이 데이터를 즉시 복사하지 않는 뷰(view)를 반환하고,
+# 실제로 값이 수정될 때만 복사가 일어나도록 합니다. 봇과 대시보드는 공유 데이터를 수정하지 않으므로
+# 방어적인 복사 없이도 안전하게 데이터를 주고받을 수 있습니다.
+pd.set_option("mode.copy_on_write", True)
 
 def setup_exchange():
     """
@@ -30,6 +36,7 @@ def setup_exchange():
     `config.py`에 정의된 `EXCHANGE_NAME` 환경 변수 값에 따라
     'BYBIT'이면 `BybitFutures` 인스턴스를, 그 외의 경우(기본값 'BINANCE')는 `BinanceFutures` 인스턴스를 생성합니다.
     이때, 각 거래소에 맞는 API 키와 시크릿을 `CFG`에서 가져와 전달합니다.
+    실제로 사용할 거래소 모듈만 이 시점에 임포트하여, 사용하지 않는 거래소 클라이언트의 임포트 비용을 피합니다.
 
     Returns:
         ExchangeClient: `BinanceFutures` 또는 `BybitFutures`의 인스턴스.
@@ -38,9 +45,11 @@ def setup_exchange():
     """
     if CFG.EXCHANGE_NAME == "BYBIT":
         # Bybit 거래소 클라이언트 생성
+        from src.exchange.bybit_futures import BybitFutures
         exchange = BybitFutures(CFG.BYBIT_API_KEY, CFG.BYBIT_API_SECRET)
     else:
         # Binance 거래소 클라이언트 생성 (기본값)
+        from src.exchange.binance_futures import BinanceFutures
         exchange = BinanceFutures(CFG.BINANCE_API_KEY, CFG.BINANCE_API_SECRET)
     return exchange
 
@@ -73,10 +82,11 @@ def start_bot_and_dashboard(repo, model, order):
     트레이딩 봇을 생성하고, 봇의 메인 루프와 대시보드를 실행합니다.
 
     - TradingBot: 모든 서비스를 인자로 받아 전체 트레이딩 로직을 관장하는 오케스트레이터입니다.
-    - `bot.loop`: 봇의 핵심 로직이 담긴 무한 루프. 백그라운드 스레드에서 실행되어
+    - `bot.loop`: 봇의 핵심 로직이 담긴 asyncio 무한 루프. 백그라운드 스레드에서 `asyncio.run`으로 실행되어
                   UI나 다른 작업을 차단하지 않습니다. `daemon=True`로 설정하여
                   메인 프로그램이 종료될 때 스레드도 함께 종료되도록 합니다.
     - `run_dashboard`: Streamlit 기반의 UI를 실행하는 함수. 메인 스레드에서 실행됩니다.
+                       Streamlit/Plotly 임포트 비용이 크므로, UI를 실제로 띄울 때만 임포트합니다.
 
     Args:
         repo (IndicatorRepository): 데이터 서비스 객체.
@@ -85,9 +95,11 @@ def start_bot_and_dashboard(repo, model, order):
     """
     # 모든 서비스를 주입하여 트레이딩 봇 인스턴스를 생성합니다.
     bot = TradingBot(repo, model, order)
-    # 봇의 메인 루프를 별도의 스레드에서 시작합니다.
-    threading.Thread(target=bot.loop, daemon=True).start()
+    # 봇의 메인 루프를 별도의 스레드에서 자체 asyncio 이벤트 루프로 시작합니다.
+    # 메인 스레드는 Streamlit 대시보드가 사용해야 하므로 `asyncio.run`을 메인 스레드에서 직접 호출하지 않습니다.
+    threading.Thread(target=lambda: asyncio.run(bot.loop()), daemon=True).start()
     # 메인 스레드에서는 대시보드를 실행합니다.
+    from src.ui.dashboard import run_dashboard
     run_dashboard(bot)
 
 def main():
@@ -95,6 +107,10 @@ def main():
     애플리케이션의 메인 실행 함수.
     각 구성 요소를 설정하고 실행하는 과정을 순차적으로 호출합니다.
     """
+    # ── 0) 로깅 설정 ──
+    # 파일/콘솔 로그 핸들러를 한 번만 설정합니다. 이후의 모든 `logging` 호출에 적용됩니다.
+    setup_logging()
+
     # ── 1) 거래소 선택 및 초기화 ──
     # 설정 파일에 따라 바이낸스 또는 바이빗 거래소 객체를 생성합니다.
     exchange = setup_exchange()
@@ -0,0 +1,148 @@
+"""
+메인 루프의 수치 계산 헬퍼 모듈.
+
+`TradingBot.loop`에서 매 사이클 실행되는 포지션 크기 계산이나 신호 계산처럼, pandas 객체 없이
+float 값이나 numpy 배열만으로 끝나는 계산을 순수 함수로 분리해 둔 곳입니다.
+입력이 스칼라 또는 numpy 배열뿐이므로 호출 비용이 작고, 단독으로 검증하기도 쉽습니다.
+"""
+import numpy as np
+
+
+def compute_qty(close: float, atr: float, margin_x_lev: float, pos_size: float,
+                max_qty: float, eps: float = 1e-6) -> float:
+    """
+    진입할 포지션 수량을 계산합니다.
+
+    Args:
+        close (float): 현재 종가.
+        atr (float): 현재 ATR 값.
+        margin_x_lev (float): `증거금 * 레버리지` 값. 0보다 크면 증거금 기준으로 수량을 계산합니다.
+        pos_size (float): 수량 기준 포지션 크기. `margin_x_lev`가 0일 때만 사용됩니다.
+        max_qty (float): 최대 허용 수량.
+        eps (float, optional): 0으로 나누는 것을 방지하기 위한 최소값. Defaults to 1e-6.
+
+    Returns:
+        float: `max_qty`로 제한된 주문 수량.
+    """
+    if margin_x_lev > 0:
+        # 증거금 기준: (사용할 증거금 * 레버리지) / 현재가
+        qty = margin_x_lev / max(close, eps)
+    else:
+        # 수량 기준: 설정된 수량을 ATR로 나눠 변동성에 따라 수량 조절
+        qty = pos_size / max(atr, eps)
+    # 최대 허용 수량을 초과하지 않도록 제한
+    return min(qty, max_qty)
+
+
+def enrich_kernel(ema_fast, ema_slow, rsi, macd, macd_sig, prob_up,
+                  out_rule_long, out_rule_short, out_long, out_short, out_exit_l, out_exit_s,
+                  buy_th: float, sell_th: float, short_th: float):
+    """
+    `Strategy`의 진입/청산 규칙을 하나로 합친(fused) 신호 계산 커널.
+
+    모든 비교/논리 연산을 `out=` 인자로 미리 할당된 bool 배열에 직접 기록하므로,
+    조건마다 임시 배열을 새로 만들지 않습니다. 임시 버퍼는 하나만 재사용합니다.
+    NaN과의 비교는 False가 되므로, pandas 비교 연산과 결과가 같습니다.
+
+    Args:
+        ema_fast, ema_slow, rsi, macd, macd_sig, prob_up (np.ndarray): 같은 길이의 입력 배열.
+        out_rule_long, out_rule_short, out_long, out_short, out_exit_l, out_exit_s (np.ndarray):
+            결과를 기록할 같은 길이의 bool 배열.
+        buy_th (float): 롱 진입 / 숏 청산 상승 확률 임계값.
+        sell_th (float): 롱 청산 상승 확률 임계값.
+        short_th (float): 숏 진입 상승 확률 임계값.
+    """
+    tmp = np.empty(len(rsi), dtype=bool)
+
+    # rule_long = (ema_fast > ema_slow) & (rsi < 40) & (macd > macd_sig)
+    np.greater(ema_fast, ema_slow, out=out_rule_long)
+    np.less(rsi, 40, out=tmp)
+    out_rule_long &= tmp
+    np.greater(macd, macd_sig, out=tmp)
+    out_rule_long &= tmp
+    # exit_s = (prob_up > buy_th) | (rsi < 30)
+    np.greater(prob_up, buy_th, out=out_exit_s)
+    np.less(rsi, 30, out=tmp)
+    out_exit_s |= tmp
+    # long = rule_long & (prob_up > buy_th)
+    np.greater(prob_up, buy_th, out=out_long)
+    out_long &= out_rule_long
+
+    # rule_short = (ema_fast < ema_slow) & (rsi > 60) & (macd < macd_sig)
+    np.less(ema_fast, ema_slow, out=out_rule_short)
+    np.greater(rsi, 60, out=tmp)
+    out_rule_short &= tmp
+    np.less(macd, macd_sig, out=tmp)
+    out_rule_short &= tmp
+    # exit_l = (prob_up < sell_th) | (rsi > 70)
+    np.less(prob_up, sell_th, out=out_exit_l)
+    np.greater(rsi, 70, out=tmp)
+    out_exit_l |= tmp
+    # short = rule_short & (prob_up < short_th)
+    np.less(prob_up, short_th, out=out_short)
+    out_short &= out_rule_short
+
+
+def tp_sl_hit(px, side, tp, sl):
+    """
+    보유 포지션들의 TP/SL 도달 여부를 한 번에 계산하는 커널.
+
+    방향(+1/-1)을 곱하면 롱/숏 구분 없이 "TP 이상 또는 SL 이하"라는 하나의 비교로 표현됩니다.
+    중간 결과는 미리 할당한 버퍼에 `out=`으로 기록하므로, 비교마다 임시 배열을 새로 만들지 않습니다.
+
+    Args:
+        px (float | np.ndarray): 현재 가격. 스칼라이면 모든 포지션에 같은 가격을 적용합니다.
+        side (np.ndarray): 포지션 방향 배열 (+1: 롱, -1: 숏).
+        tp (np.ndarray): 익절 가격 배열.
+        sl (np.ndarray): 손절 가격 배열.
+
+    Returns:
+        np.ndarray: TP 또는 SL에 도달한 포지션이면 True인 bool 배열.
+    """
+    buf = np.empty(len(side), dtype=np.float64)
+    hit = np.empty(len(side), dtype=bool)
+    tmp = np.empty(len(side), dtype=bool)
+    # side * (px - tp) >= 0
+    np.subtract(px, tp, out=buf)
+    buf *= side
+    np.greater_equal(buf, 0, out=hit)
+    # side * (px - sl) <= 0
+    np.subtract(px, sl, out=buf)
+    buf *= side
+    np.less_equal(buf, 0, out=tmp)
+    hit |= tmp
+    return hit
+
+
+def first_tp_sl_exit(prices, side: int, tp: float, sl: float) -> int:
+    """
+    가격 경로(틱 배열)를 따라가며 포지션 하나가 처음으로 TP/SL에 도달하는 틱을 찾는 커널.
+
+    `tp_sl_hit`이 "한 가격 × 여러 포지션"을 판정한다면, 이 함수는 "여러 가격 × 한 포지션"을 판정합니다.
+    과거 가격 배열 전체로 청산 시뮬레이션을 할 때 `OrderService.poll_position_closed`를 틱마다 호출하는 대신,
+    이 커널로 청산 틱을 한 번에 찾은 뒤 그 가격으로 한 번만 호출하면 됩니다.
+
+    Args:
+        prices (np.ndarray): 시간 순서대로 정렬된 가격 배열.
+        side (int): 포지션 방향 (+1: 롱, -1: 숏).
+        tp (float): 익절 가격.
+        sl (float): 손절 가격.
+
+    Returns:
+        int: 처음으로 TP 또는 SL에 도달한 틱의 인덱스. 끝까지 도달하지 않으면 -1.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    buf = np.empty(prices.size, dtype=np.float64)
+    hit = np.empty(prices.size, dtype=bool)
+    tmp = np.empty(prices.size, dtype=bool)
+    # side * (px - tp) >= 0
+    np.subtract(prices, tp, out=buf)
+    buf *= side
+    np.greater_equal(buf, 0, out=hit)
+    # side * (px - sl) <= 0
+    np.subtract(prices, sl, out=buf)
+    buf *= side
+    np.less_equal(buf, 0, out=tmp)
+    hit |= tmp
+    i = int(hit.argmax()) if hit.size else 0
+    return i if hit.size and hit[i] else -1
@@ -5,8 +5,9 @@
 주입받아, 이들을 조율하여 실제 트레이딩 로직을 수행합니다.
 
 주요 역할:
-- **메인 루프 (`loop`)**: 정해진 주기(`CFG.SLEEP_SEC`)마다 반복 실행되는 무한 루프.
-  이 루프 안에서 데이터 조회, 모델 학습/예측, 신호 생성, 주문 실행의 전체 과정이 일어납니다.
+- **메인 루프 (`loop`)**: asyncio 기반 무한 루프. 포지션이 없을 때는 거래소 웹소켓의 봉 마감 이벤트마다,
+  포지션 보유 중에는 `CFG.SLEEP_SEC` 주기마다 한 사이클(`loop_once`)을 실행합니다.
+  한 사이클 안에서 데이터 조회, 모델 학습/예측, 신호 생성, 주문 실행의 전체 과정이 일어납니다.
 - **주기적 모델 재학습**: 설정된 시간(`CFG.RETRAIN_HR`)이 경과하면, 최신 데이터를 사용하여
   `ModelService`의 `train` 메서드를 호출하여 모델을 재학습시킵니다.
 - **매매 결정 및 실행**:
@@ -14,23 +15,48 @@
   2. `ModelService`를 사용해 데이터에 예측 확률을 추가합니다.
   3. `Strategy`를 사용해 최종 매매 신호를 생성합니다.
   4. 생성된 신호에 따라 `OrderService`를 통해 포지션을 열거나, 현재 포지션 상태를 관리합니다.
-- **데이터 공유**: UI(대시보드) 스레드와 최신 데이터프레임을 안전하게 공유하기 위해
-  `threading.Lock`을 사용하여 `df_latest`에 대한 접근을 제어합니다.
+- **데이터 공유**: 메인 루프는 컬럼별 numpy 링 버퍼에 새로 생긴 행(과 갱신된 마지막 행)만 기록하고,
+  읽기 전용 numpy 배열 스냅샷을 게시하여 UI(대시보드) 스레드에 전달합니다. 각 대시보드 세션은 렌더링하는 동안
+  가장 최근 스냅샷의 버퍼를 고정(`snapshot_df`)하며, 데이터프레임은 필요할 때만 만들어집니다.
 """
 import time
-import threading
+import asyncio
 import logging
-from datetime import datetime
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
 from config.config import CFG
 from src.utils.helpers import tg
+from src.bot._fast import compute_qty
 from src.strategy.strategy import Strategy
 from src.order.order_service import OrderService
 from src.model.model_service import ModelService
 from src.data.indicator_repository import IndicatorRepository
 
+# 메인 루프에서 매 사이클 참조하는 설정 상수들을 모듈 로드 시점에 지역 이름으로 묶어 둡니다.
+# 설정 값은 실행 중 바뀌지 않으므로 `CFG.X` 속성 조회를 반복할 필요가 없습니다.
+_MXL = CFG.MARGIN_X_LEV
+_POS = CFG.POS_SIZE
+_MAXQ = CFG.MAX_QTY
+_SLEEP = CFG.SLEEP_SEC
+_EPS = CFG.EPS
+
 class TradingBot:
     """메인 트레이딩 루프를 관리하고 모든 서비스를 조율하는 클래스."""
 
+    # UI와 공유할 최근 캔들 개수 (링 버퍼 크기).
+    RING_SIZE = 500
+    # 봉 마감 이벤트를 구독할 기준 타임프레임과, 이벤트가 오지 않을 때 사이클을 강제로 실행할 최대 대기 시간(초).
+    BAR_TF = "15m"
+    BAR_TIMEOUT_SEC = 15 * 60 + 30
+    # 같은 오류에 대한 텔레그램 알림을 다시 보내기까지의 최소 간격(초)과, 오류 발생 후 재시도 대기 시간(초).
+    ERR_ALERT_TTL_SEC = 300
+    ERR_RETRY_SEC = 5
+    # 기준 타임프레임 한 봉의 길이(초)와, 웹소켓 없이 폴링할 때 봉 경계 이후 깨어나기까지 둘 여유(초).
+    BAR_SEC = 15 * 60
+    BAR_WAKE_DELAY_SEC = 5
+
     def __init__(self, repo: IndicatorRepository, model: ModelService, order: OrderService):
         """
         TradingBot 인스턴스를 초기화합니다.
@@ -41,89 +67,343 @@ class TradingBot:
             order (OrderService): 주문 및 포지션 관리 서비스.
         """
         self.repo, self.model, self.order = repo, model, order
-        # UI 스레드와 공유될 최신 데이터프레임. None으로 초기화.
-        self.df_latest = None
-        # `df_latest`에 대한 동시 접근을 막기 위한 락(lock).
-        self.lock = threading.Lock()
+        # 매수/매도 임계값을 지역 변수로 고정한 신호 계산 함수 (`Strategy.compile` 참고).
+        self._enrich = Strategy.compile(CFG)
+        # UI 스레드와 공유될 컬럼별 링 버퍼. 첫 데이터가 들어올 때 컬럼/dtype에 맞춰 할당됩니다.
+        self.ring = None
+        self._ring_ts = np.empty(self.RING_SIZE, dtype="datetime64[ns]")
+        # 대시보드용 데이터프레임의 인덱스 이름 (`IndicatorRepository`의 타임스탬프 인덱스와 동일).
+        self._ring_index_name = "ts"
+        # 다음에 기록할 위치(head)와 현재 채워진 행 수.
+        self.ring_head = 0
+        self._ring_len = 0
+        # 링 버퍼에 마지막으로 기록된 캔들의 타임스탬프.
+        self._ring_last_ts = None
+        # 메인 루프(생산자)가 마지막으로 게시한 스냅샷. (버퍼 번호, 스냅샷) 형태이며,
+        # 스냅샷은 (번호, 타임스탬프 배열, {컬럼: 배열}) 형태의 읽기 전용 numpy 배열 묶음입니다.
+        self._snap_latest = None
+        # 스냅샷용으로 미리 할당해 두는 버퍼 목록과, 버퍼별로 그 버퍼를 읽고 있는 대시보드 세션 수.
+        # 각 버퍼는 (타임스탬프 배열, {컬럼: 배열}) 형태이며 링 버퍼를 할당할 때 세 벌을 함께 할당합니다.
+        self._snap_bufs = None
+        self._snap_pins = []
+        # 게시/고정/반납을 보호하는 락. 버퍼 번호를 고르고 바꾸는 짧은 순간에만 잡으며,
+        # 버퍼를 채우거나 데이터프레임을 렌더링하는 동안에는 잡지 않습니다.
+        self._snap_lock = threading.Lock()
+        # 스냅샷을 게시할 때마다 1씩 증가하는 번호. 대시보드는 이 번호를 키로 렌더링 결과를 캐시합니다.
+        self._snap_id = 0
+        # 마지막으로 예측/신호 계산을 수행한 캔들의 타임스탬프.
+        self._last_bar_ts = None
+        # 웹소켓으로 마지막으로 확인한 봉의 시작 시각(ms)과, 직전 사이클의 거래 일시 중단 여부.
+        self._ws_bar_ts = None
+        self._paused = False
+        # 대기 중인 메인 루프를 즉시 깨우기 위한 이벤트와, 메인 루프가 실행 중인 이벤트 루프.
+        # 이벤트 루프는 `loop` 시작 시 기록되며, 다른 스레드는 `wake`를 통해서만 이벤트를 설정합니다.
+        self._wakeup = asyncio.Event()
+        self._aloop = None
+        # 거래 중단이 수동으로 해제되면 대기 중인 루프를 바로 깨웁니다.
+        self.order.on_resume = self.wake
+        # 오류 알림 속도 제한용 캐시. {(예외 타입 이름, 메시지 앞부분): 마지막 알림 시각(monotonic)}
+        self._err_cache = {}
+
+    def _ring_start(self, idx: np.ndarray) -> int:
+        """
+        `idx` 중 링 버퍼에 새로 기록해야 할 첫 행의 위치를 반환합니다.
+
+        마지막으로 기록된 캔들(진행 중이던 봉일 수 있음)부터 포함하며, 최대 `RING_SIZE`행으로 제한됩니다.
+        """
+        # 타임스탬프가 정렬되어 있으므로, 마지막 기록 시각 이후의 행 범위를 이진 탐색으로 찾습니다.
+        start = 0 if self._ring_last_ts is None else int(np.searchsorted(idx, self._ring_last_ts))
+        return max(start, len(idx) - self.RING_SIZE)
+
+    def _update_ring(self, arrays: dict, idx: np.ndarray):
+        """
+        새로 추가된 행만 링 버퍼에 기록하고, UI용 스냅샷을 게시합니다.
+
+        마지막으로 기록된 캔들은 아직 진행 중인 봉일 수 있으므로 같은 타임스탬프의 행은 덮어쓰고,
+        그 이후의 행들만 새로 추가합니다. 컬럼 구성이 바뀌면 버퍼를 다시 할당합니다.
+        링 버퍼는 메인 루프 스레드만 수정하므로 락이 필요하지 않습니다.
+
+        Args:
+            arrays (dict[str, np.ndarray]): `Strategy.enrich_soa`까지 적용된 컬럼별 배열.
+                신호 컬럼처럼 꼬리 구간(`_ring_start` 이후)만 담긴 배열이 섞여 있어도 됩니다.
+            idx (np.ndarray): 각 행의 타임스탬프 배열 (오름차순).
+        """
+        n = self.RING_SIZE
+        if self.ring is None or list(self.ring) != list(arrays):
+            self.ring = {col: np.empty(n, dtype=arr.dtype) for col, arr in arrays.items()}
+            self.ring_head, self._ring_len, self._ring_last_ts = 0, 0, None
+            # 세션이 아직 읽고 있는 이전 버퍼는 그대로 두고 새 목록을 만듭니다. 이전 버퍼의 반납은 이전 목록에 기록됩니다.
+            with self._snap_lock:
+                self._snap_bufs = [self._new_snap_buf() for _ in range(3)]
+                self._snap_pins = [0] * len(self._snap_bufs)
+                self._snap_latest = None
+
+        start = self._ring_start(idx)
+        k = len(idx) - start
+        if k <= 0:
+            return
+
+        head, length = self.ring_head, self._ring_len
+        # 진행 중이던 마지막 봉이 갱신된 경우, 해당 슬롯을 덮어씁니다.
+        if length and idx[start] == self._ring_last_ts:
+            head, length = (head - 1) % n, length - 1
+        pos = (head + np.arange(k)) % n
+        # 모든 배열은 끝이 최신 행으로 맞춰져 있으므로, 길이와 무관하게 마지막 k개 원소를 기록합니다.
+        for col, buf in self.ring.items():
+            buf[pos] = arrays[col][-k:]
+        self._ring_ts[pos] = idx[start:]
+        self.ring_head = (head + k) % n
+        self._ring_len = min(length + k, n)
+        self._ring_last_ts = idx[-1]
 
-    def loop(self):
+        self._publish_snapshot()
+
+    def _new_snap_buf(self):
+        """링 버퍼와 같은 크기와 dtype을 갖는 읽기 전용 스냅샷 버퍼 한 벌을 할당합니다."""
+        n = self.RING_SIZE
+        buf = (np.empty(n, dtype=self._ring_ts.dtype),
+               {col: np.empty(n, dtype=arr.dtype) for col, arr in self.ring.items()})
+        for arr in (buf[0], *buf[1].values()):
+            arr.flags.writeable = False
+        return buf
+
+    def _publish_snapshot(self):
+        """
+        링 버퍼를 시간 순서로 정렬한 읽기 전용 스냅샷을 만들어 최신 스냅샷으로 게시합니다.
+
+        스냅샷은 매번 새로 할당하지 않고, 미리 할당한 버퍼 중 지금 아무도 읽고 있지 않은 버퍼에 채운 뒤 게시합니다.
+        - 대시보드 세션이 고정한 버퍼와, 현재 게시된 스냅샷의 버퍼(채우는 동안 새 세션이 고정할 수 있음)는 건너뜁니다.
+        - 동시에 읽는 세션이 많아 빈 버퍼가 없으면 버퍼를 한 벌 더 할당합니다. 세션이 하나면 세 벌로 충분합니다.
+        고른 버퍼는 게시되기 전까지 어떤 세션도 고정할 수 없으므로, 버퍼를 채우는 동안에는 락을 잡지 않습니다.
+        """
+        with self._snap_lock:
+            latest = self._snap_latest[0] if self._snap_latest is not None else -1
+            i = next((j for j, pins in enumerate(self._snap_pins) if not pins and j != latest), None)
+            if i is None:
+                self._snap_bufs.append(self._new_snap_buf())
+                self._snap_pins.append(0)
+                i = len(self._snap_bufs) - 1
+
+        k = self._ring_len
+        order = (self.ring_head - k + np.arange(k)) % self.RING_SIZE
+        ts_buf, data_buf = self._snap_bufs[i]
+        # 버퍼 자체는 읽기 전용으로 두고, 채우는 동안에만 쓰기를 허용합니다.
+        for src, dst in ((self._ring_ts, ts_buf), *((self.ring[col], buf) for col, buf in data_buf.items())):
+            dst.flags.writeable = True
+            np.take(src, order, out=dst[:k])
+            dst.flags.writeable = False
+        ts = ts_buf[:k]
+        data = {col: buf[:k] for col, buf in data_buf.items()}
+        self._snap_id += 1
+        with self._snap_lock:
+            self._snap_latest = (i, (self._snap_id, ts, data))
+
+    def get_snapshot(self):
+        """
+        UI 스레드에서 가장 최근 스냅샷을 가져와 그 버퍼를 고정합니다. 데이터를 복사하지 않습니다.
+
+        여러 대시보드 세션(브라우저 탭)이 동시에 호출해도 됩니다. 고정된 버퍼는 `release_snapshot`으로 반납할 때까지
+        덮어쓰이지 않습니다. 반납한 뒤에도 값을 보관하려면 복사해야 합니다. 보통은 `snapshot_df`를 사용합니다.
+
+        Returns:
+            tuple: (반납용 토큰, 스냅샷). 스냅샷은 (번호, 타임스탬프 배열, {컬럼: 배열}) 형태의 읽기 전용 배열 묶음입니다.
+            아직 데이터가 없으면 (None, None).
+        """
+        with self._snap_lock:
+            if self._snap_latest is None:
+                return None, None
+            i, snap = self._snap_latest
+            self._snap_pins[i] += 1
+            # 버퍼 목록이 다시 할당되더라도 원래 목록에 반납되도록, 고정 횟수 목록 자체를 토큰에 담습니다.
+            return (self._snap_pins, i), snap
+
+    def release_snapshot(self, token):
+        """`get_snapshot`으로 고정한 버퍼를 반납합니다. 토큰이 None이면 아무것도 하지 않습니다."""
+        if token is None:
+            return
+        pins, i = token
+        with self._snap_lock:
+            pins[i] -= 1
+
+    async def loop_once(self):
         """
-        봇의 메인 실행 루프. `main.py`에서 백그라운드 스레드로 실행됩니다.
+        메인 루프의 한 사이클(데이터 조회 → 재학습 → 예측/신호 → 주문)을 수행합니다.
+        """
+        # 1. 리스크 관리 확인: 연속 손실로 인해 거래가 일시 중단 상태인지 확인합니다.
+        self._paused = self.order.is_paused()
+        if self._paused:
+            return # 일시 중단 상태이면 이번 사이클의 나머지 부분을 건너뜁니다.
+
+        # 2. 데이터 준비: IndicatorRepository를 통해 최신 멀티-타임프레임 데이터를 컬럼별 numpy 배열로 가져옵니다.
+        # 이후 예측/신호/주문 단계는 모두 이 배열 위에서 처리되며, 데이터프레임은 만들지 않습니다.
+        # 세 타임프레임의 조회는 `asyncio.gather`로 동시에 요청됩니다.
+        arrays, idx = await self.repo.get_merged_soa_async()
+
+        # 새 캔들이 생기지 않았고 보유 포지션도 없다면, 같은 캔들을 다시 예측/평가할 필요가 없습니다.
+        # (포지션 보유 중에는 TP/SL 확인을 위해 현재가가 필요하므로 계속 진행합니다.)
+        bar_ts = idx[-1]
+        if bar_ts == self._last_bar_ts and self.order.pos is None:
+            return
+
+        # 3. 모델 재학습 여부 결정 및 실행
+        # 재학습 여부(`ModelService.retrain_due`)는 미리 계산된 monotonic 마감 시각과의 float 비교만 수행합니다.
+        # 학습은 별도 프로세스에서 실행되며, 끝날 때까지는 기존 모델(없으면 중립 확률 0.5)로 계속 예측합니다.
+        self.model.poll_training()
+        if self.model.retrain_due() and not self.model.training:
+            # 학습은 드물게 일어나므로, 이때만 데이터프레임을 구성합니다.
+            self.model.train_async(pd.DataFrame(arrays, index=pd.DatetimeIndex(idx, name=self._ring_index_name), copy=False))
+
+        # 4. 예측 및 전략 적용
+        # 신호는 링 버퍼에 아직 기록되지 않은 행(보통 진행 중인 마지막 봉 하나)에 대해서만 계산합니다.
+        self.model.add_prob_soa(arrays, idx)                   # 데이터에 모델 예측 확률 추가
+        self._enrich(arrays, self._ring_start(idx))            # 예측 확률과 규칙을 결합하여 최종 신호 생성
+        self._last_bar_ts = bar_ts
+
+        # 5. UI용 데이터 업데이트 (스레드 안전)
+        # 새로 생긴 행만 링 버퍼에 기록하므로 매 사이클 500행 전체를 복사하지 않습니다.
+        self._update_ring(arrays, idx)
+
+        # 가장 마지막 데이터(가장 최신 캔들)의 값들을 배열에서 직접 읽어옵니다.
+        close = float(arrays["close"][-1])
+        atr = float(arrays["atr"][-1])
+        go_long = bool(arrays["long"][-1])
+        go_short = bool(arrays["short"][-1])
+
+        # 6. 주문 로직 실행
+        if self.order.pos is None: # 현재 보유 포지션이 없는 경우
+            if go_long or go_short: # 새로운 롱 또는 숏 진입 신호가 발생했다면
+                # 포지션 크기(qty) 계산: 증거금 기준 또는 ATR로 나눈 수량 기준, 최대 수량으로 제한
+                qty = compute_qty(close, atr, _MXL, _POS, _MAXQ, _EPS)
+
+                # OrderService를 통해 포지션 진입 요청
+                if go_long:
+                    self.order.open_position(close, qty, "long")
+                if go_short:
+                    self.order.open_position(close, qty, "short")
+        else: # 현재 보유 포지션이 있는 경우
+            # 라이브 모드: 거래소의 실제 포지션과 동기화하여 불일치 문제 해결
+            self.order.sync_position()
+            # 페이퍼 모드: 현재 가격을 기준으로 TP/SL 도달 여부 확인
+            self.order.poll_position_closed(close)
+
+    async def _wait_bar_close(self):
+        """
+        거래소 웹소켓(`watch_ohlcv`)으로 기준 타임프레임 캔들을 구독하다가, 새 봉이 시작되면(= 이전 봉 마감) 반환합니다.
         """
         while True:
-            try:
-                # 1. 리스크 관리 확인: 연속 손실로 인해 거래가 일시 중단 상태인지 확인합니다.
-                if self.order.is_paused():
-                    time.sleep(CFG.SLEEP_SEC)
-                    continue # 일시 중단 상태이면 루프의 나머지 부분을 건너뛰고 다음 사이클로 넘어갑니다.
-
-                # 2. 데이터 준비: IndicatorRepository를 통해 최신 멀티-타임프레임 데이터를 가져옵니다.
-                df = self.repo.get_merged()
-
-                # 3. 모델 재학습 여부 결정 및 실행
-                # BUGFIX 주석: `.seconds`는 시간 차이의 '초' 부분만 반환(최대 86399).
-                # 총 경과 시간을 초로 계산하려면 `.total_seconds()`를 사용해야 합니다.
-                need_train = (self.model.model is None or
-                              (datetime.utcnow() - self.model.t_last_train).total_seconds() >
-                              CFG.RETRAIN_HR * 3600)
-                if need_train:
-                    self.model.train(df)
-
-                # 4. 예측 및 전략 적용
-                df = self.model.add_prob(df) # 데이터에 모델 예측 확률 추가
-                df = Strategy.enrich(df)     # 예측 확률과 규칙을 결합하여 최종 신호 생성
-
-                # 5. UI용 데이터 업데이트 (스레드 안전)
-                with self.lock:
-                    # `df_latest`를 업데이트할 때 락을 사용하여,
-                    # UI 스레드가 `get_df`를 통해 데이터를 읽는 동안 데이터가 변경되는 것을 방지합니다.
-                    self.df_latest = df.tail(500).copy()
-
-                # 가장 마지막 데이터(가장 최신 캔들)를 `last` 변수에 저장합니다.
-                last = df.iloc[-1]
-
-                # 6. 주문 로직 실행
-                if self.order.pos is None: # 현재 보유 포지션이 없는 경우
-                    if last["long"] or last["short"]: # 새로운 롱 또는 숏 진입 신호가 발생했다면
-                        # 포지션 크기(qty) 계산
-                        if CFG.MARGIN_PER_TRADE > 0:
-                            # 증거금 기준: (사용할 증거금 * 레버리지) / 현재가
-                            qty = (CFG.MARGIN_PER_TRADE * CFG.LEVERAGE) / max(last["close"], 1e-6)
-                        else:
-                            # 수량 기준: 설정된 수량을 ATR로 나눠 변동성에 따라 수량 조절 (현재는 POS_SIZE가 작아 거의 고정수량)
-                            qty = CFG.POS_SIZE / max(last["atr"], 1e-6)
-
-                        # 최대 허용 수량을 초과하지 않도록 제한
-                        qty = min(qty, CFG.MAX_QTY)
-
-                        # OrderService를 통해 포지션 진입 요청
-                        if last["long"]:
-                            self.order.open_position(last["close"], qty, "long")
-                        if last["short"]:
-                            self.order.open_position(last["close"], qty, "short")
-                else: # 현재 보유 포지션이 있는 경우
-                    # 라이브 모드: 거래소의 실제 포지션과 동기화하여 불일치 문제 해결
-                    self.order.sync_position()
-                    # 페이퍼 모드: 현재 가격을 기준으로 TP/SL 도달 여부 확인
-                    self.order.poll_position_closed(last["close"])
+            candles = await self.repo.exchange.watch_ohlcv(self.repo.symbol, self.BAR_TF)
+            if not candles:
+                continue
+            ts = candles[-1][0]
+            if self._ws_bar_ts is not None and ts != self._ws_bar_ts:
+                self._ws_bar_ts = ts
+                return
+            self._ws_bar_ts = ts
+
+    def wake(self):
+        """
+        대기 중인 메인 루프를 즉시 깨웁니다. 어느 스레드에서 호출해도 안전합니다.
 
+        대시보드에서 거래 중단을 해제하면(`OrderService.resume` → `on_resume`) 호출되어, 남은 대기 시간이나
+        봉 마감을 기다리지 않고 다음 사이클을 바로 실행하게 합니다.
+        """
+        if self._aloop is not None:
+            self._aloop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _sleep(self, sec: float):
+        """최대 `sec`초 동안 잠들되, 그 사이 `wake`가 호출되면 바로 반환합니다."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=sec)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _sleep_until_next_bar(self):
+        """
+        다음 봉 경계(+`BAR_WAKE_DELAY_SEC`)까지 잠듭니다.
+
+        고정 주기(`CFG.SLEEP_SEC`)로 폴링하면 같은 캔들을 반복해서 조회하게 되므로,
+        웹소켓을 사용할 수 없을 때도 봉마다 최대 한 번만 데이터를 조회하도록 깨어나는 시각을 봉 경계에 맞춥니다.
+        """
+        now = time.time()
+        next_bar = (now // self.BAR_SEC + 1) * self.BAR_SEC + self.BAR_WAKE_DELAY_SEC
+        await self._sleep(max(1.0, next_bar - now))
+
+    async def _wait_next(self):
+        """
+        다음 사이클까지 대기합니다.
+
+        - 거래 일시 중단 중: 중단이 해제되는 시각까지 잠듭니다.
+        - 포지션 보유 중: TP/SL 확인을 위해 `CFG.SLEEP_SEC` 주기로 깨어납니다.
+        - 그 외: 웹소켓으로 봉 마감 이벤트를 기다립니다. 웹소켓을 사용할 수 없으면 다음 봉 경계까지 잠듭니다.
+
+        어느 경우든 그 사이 `wake`가 호출되면(예: 대시보드에서 거래 중단을 해제) 바로 반환합니다.
+        """
+        if self._paused:
+            await self._sleep(self.order.pause_remaining())
+            return
+        if self.order.pos is not None:
+            await self._sleep(_SLEEP)
+            return
+        # 봉 마감 대기와 `wake` 이벤트를 경쟁시켜, 먼저 끝나는 쪽에서 바로 반환합니다. 남은 쪽은 취소합니다.
+        bar = asyncio.ensure_future(self._wait_bar_close())
+        woke = asyncio.ensure_future(self._wakeup.wait())
+        done, pending = await asyncio.wait((bar, woke), timeout=self.BAR_TIMEOUT_SEC,
+                                           return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._wakeup.clear()
+        if bar in done and bar.exception() is not None:
+            logging.warning(f"Websocket bar-close wait failed ({bar.exception()}). Falling back to polling.")
+            self._ws_bar_ts = None
+            await self._sleep_until_next_bar()
+
+    async def loop(self):
+        """
+        봇의 메인 실행 루프. `main.py`에서 백그라운드 스레드의 asyncio 이벤트 루프로 실행됩니다.
+
+        고정 주기로 REST 폴링을 반복하는 대신, 포지션이 없을 때는 웹소켓 봉 마감 이벤트가 올 때만 사이클을 실행합니다.
+        """
+        self._aloop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self.loop_once()
                 # 다음 루프 사이클까지 대기
-                time.sleep(CFG.SLEEP_SEC)
+                await self._wait_next()
             except Exception as e:
                 # 루프 내에서 어떤 예외든 발생하면 로그를 남기고, 잠시 대기 후 루프를 계속합니다.
+                # 같은 오류가 반복될 때 텔레그램이 도배되지 않도록 알림만 `ERR_ALERT_TTL_SEC` 간격으로 제한합니다.
                 logging.error(f"An error occurred in the main loop: {e}")
-                tg(f"⚠️ An error occurred in the main loop: {e}")
-                time.sleep(30)
+                key = (type(e).__name__, str(e)[:80])
+                now = time.monotonic()
+                if now - self._err_cache.get(key, float("-inf")) > self.ERR_ALERT_TTL_SEC:
+                    self._err_cache[key] = now
+                    tg(f"⚠️ An error occurred in the main loop: {e}")
+                await self._sleep(self.ERR_RETRY_SEC)
 
-    def get_df(self):
+    @contextmanager
+    def snapshot_df(self):
         """
-        UI 스레드에서 최신 데이터프레임을 안전하게 가져가기 위한 메서드.
+        UI 스레드에서 최신 데이터프레임을 안전하게 읽기 위한 컨텍스트 매니저.
 
-        Returns:
-            pd.DataFrame or None: 최신 데이터프레임의 복사본. 아직 데이터가 없으면 None.
+        `get_snapshot`으로 고정한 numpy 배열 스냅샷으로부터 데이터프레임을 구성하고, 블록을 빠져나갈 때 버퍼를 반납합니다.
+        데이터프레임은 블록 안에서만 유효하므로, 블록 밖에서도 쓸 값은 복사해 두어야 합니다.
+        데이터프레임은 UI가 요청할 때만 만들어지므로, 메인 루프에서는 데이터프레임 생성 비용이 들지 않습니다.
+        함께 반환되는 스냅샷 번호는 데이터가 바뀔 때만 증가하므로, UI는 이 번호를 캐시 키로 사용할 수 있습니다.
+
+        Yields:
+            tuple[int, pd.DataFrame or None]: (스냅샷 번호, 최근 캔들(최대 `RING_SIZE`개)의 데이터프레임).
+            아직 데이터가 없으면 (0, None).
         """
-        with self.lock:
-            # 락을 사용하여 `df_latest`를 읽는 동안 메인 루프 스레드가 데이터를 수정하지 못하도록 보장합니다.
-            # `.copy()`를 사용하여 데이터의 복사본을 반환함으로써, UI 스레드에서의 작업이
-            # 봇의 내부 데이터에 영향을 주지 않도록 합니다.
-            return self.df_latest.copy() if self.df_latest is not None else None
+        token, snap = self.get_snapshot()
+        try:
+            if snap is None:
+                yield 0, None
+            else:
+                snap_id, ts, data = snap
+                # 스냅샷 배열은 읽기 전용이고 Copy-on-Write 모드(`main.py`)에서는 수정 시에만 복사가 일어나므로,
+                # 데이터프레임을 만들 때 배열을 다시 복사하지 않습니다.
+                yield snap_id, pd.DataFrame(data, index=pd.DatetimeIndex(ts, name=self._ring_index_name), copy=False)
+        finally:
+            self.release_snapshot(token)
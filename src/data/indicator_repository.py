@@ -4,16 +4,25 @@
 이 클래스는 트레이딩 전략에 필요한 데이터를 준비하는 핵심적인 역할을 수행합니다.
 주요 기능은 다음과 같습니다:
 1. 여러 타임프레임(예: 15분, 1시간, 4시간)의 OHLCV 데이터를 거래소로부터 조회합니다.
-2. 조회한 데이터를 Parquet 파일 형식으로 로컬에 캐싱(caching)하여, 다음 조회 시 API 요청을 최소화하고 속도를 향상시킵니다.
+2. 조회한 데이터를 메모리에 유지하고 Parquet 파일 형식으로 로컬에 캐싱(caching)하여, 다음 조회 시 API 요청을 최소화하고 속도를 향상시킵니다.
+   캐시는 타임프레임별 디렉토리에 저장되며, 시작 시 한 번만 읽고 이후에는 새로 마감된 봉만 별도 파일로 추가합니다.
 3. 각 타임프레임 데이터에 기술적 지표(EMA, RSI 등)를 추가합니다.
 4. 상위 타임프레임(1h, 4h)의 데이터를 기준 타임프레임(15m)에 맞게 리샘플링(resampling)합니다.
 5. 모든 데이터를 병합하여 최종적으로 모델 학습 및 예측에 사용될 통합 데이터프레임을 생성합니다.
 """
+import os
+import time
+import atexit
+import asyncio
 import logging
 import ccxt
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
 from config.config import CFG
-from src.utils.helpers import add_indicators
+from src.utils.helpers import IndicatorEngine
 from src.exchange.exchange_client import ExchangeClient
 
 class IndicatorRepository:
@@ -21,6 +30,22 @@ class IndicatorRepository:
     15분, 1시간, 4시간 봉 데이터를 조회, 캐싱, 병합하여 제공하는 클래스.
     """
 
+    # 병합 결과에서 float32로 저장할 컬럼들 (거래량과 가격으로부터 계산된 지표).
+    # 시가/고가/저가/종가는 주문 가격과 TP/SL 계산에 그대로 쓰이므로 float64를 유지합니다.
+    FLOAT32_COLS = ("volume", "ema_fast", "ema_slow", "rsi", "atr", "macd", "macd_sig",
+                    "bb_low", "bb_high", "rsi_1h", "ema_fast_4h", "ema_slow_4h")
+
+    # 거래소 클라이언트가 `ohlcv_candle_limit`를 정의하지 않았을 때 사용할 1회 조회 최대 캔들 수.
+    DEFAULT_CANDLE_LIMIT = 500
+
+    # 캐시 디렉토리에 조각 파일이 이만큼 쌓이면, 보관 구간 전체를 파일 하나로 다시 써서 정리(compaction)합니다.
+    COMPACT_EVERY = 100
+    # 메모리와 파일에 보관할 타임프레임별 최대 봉 개수. 조회 시 사용하는 `limit`(기본 500)보다 넉넉하게 둡니다.
+    KEEP_ROWS = 1000
+    # 캐시 파일 작성 옵션. 연속적인 실수 값은 사전(dictionary) 인코딩 효과가 없으므로 끄고,
+    # zstd 레벨 1로 snappy와 비슷한 CPU 비용에 더 작은 파일을 만듭니다.
+    PARQUET_OPTS = {"compression": "zstd", "compression_level": 1, "use_dictionary": False}
+
     def __init__(self, exchange: ExchangeClient, symbol: str):
         """
         IndicatorRepository 인스턴스를 초기화합니다.
@@ -31,16 +56,212 @@ class IndicatorRepository:
         """
         self.exchange = exchange
         self.symbol = symbol
+        # 타임프레임별 OHLCV 데이터의 메모리 캐시. 파일은 타임프레임마다 처음 한 번만 읽습니다.
+        self._cache: dict[str, pd.DataFrame] = {}
+        # 타임프레임별 캐시 디렉토리의 조각 파일 수와, 파일에 기록된 마지막 봉의 시각.
+        self._parts: dict[str, int] = {}
+        self._persisted_ts: dict[str, pd.Timestamp] = {}
+        # 동기 버전 `get_merged`에서 세 타임프레임을 동시에 조회하기 위한 작업 스레드 풀.
+        # 각 작업은 네트워크 응답을 기다리는 동안 GIL을 놓으므로, 세 요청의 대기 시간이 겹쳐집니다.
+        self._pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="ohlcv")
+        atexit.register(self.close)
+        # 타임프레임별 지표 계산 결과 캐시. {타임프레임: (원본 데이터 지문, 지표가 추가된 데이터프레임)}
+        self._ind: dict[str, tuple] = {}
+        # 타임프레임별 지표 계산기. 새로 들어온 봉의 지표만 이어서 계산합니다.
+        self._engines: dict[str, IndicatorEngine] = {}
+        # 마지막으로 병합한 결과와, 그때 사용한 타임프레임별 지문 묶음.
+        self._merged = None
+        self._merged_key = None
+
+    def close(self):
+        """조회 스레드 풀을 정리합니다. 캐시 파일은 기록할 때마다 완성되므로 따로 닫을 것이 없습니다."""
+        self._pool.shutdown(wait=True)
+
+    @staticmethod
+    def _part_files(cache_dir) -> list:
+        """캐시 디렉토리의 조각 파일 목록을 시간 순서(파일 이름 순서)로 반환합니다. 작성 중인 임시 파일(`.tmp-*`)은 제외됩니다."""
+        return sorted(cache_dir.glob("part-*.parquet")) if cache_dir.is_dir() else []
+
+    @classmethod
+    def _load_cache(cls, cache_dir) -> pd.DataFrame:
+        """
+        캐시 디렉토리의 조각 파일들을 읽어 하나의 데이터프레임으로 합칩니다.
+
+        각 조각 파일은 완성된 뒤에만 제 이름을 가지므로 보통은 모두 읽을 수 있지만, 읽지 못하는 파일이 있으면
+        그 파일만 건너뛰고 경고를 남깁니다. 정리(compaction) 도중 종료되어 구간이 겹치는 경우를 위해
+        같은 시각의 행은 마지막 값만 남깁니다.
+        """
+        frames = []
+        for f in cls._part_files(cache_dir):
+            try:
+                frames.append(pd.read_parquet(f, engine="pyarrow"))
+            except Exception as e:
+                logging.warning(f"Failed to read cache file {f}: {e}. Skipping it.")
+        if not frames:
+            return pd.DataFrame()
+        full = pd.concat(frames).sort_index(kind="stable")
+        return full[~full.index.duplicated(keep="last")].iloc[-cls.KEEP_ROWS:]
+
+    def _write_part(self, cache_dir, df: pd.DataFrame):
+        """
+        `df`를 캐시 디렉토리에 조각 파일 하나로 기록합니다.
+
+        임시 이름으로 파일을 완성한 뒤 `os.replace`로 한 번에 제 이름을 붙이므로, 기록 도중 프로세스가 죽어도
+        읽을 수 없는 조각 파일이 남지 않습니다. 파일 이름에는 첫 봉과 마지막 봉의 시각(ms)이 들어가
+        이름 순서가 곧 시간 순서가 됩니다.
+        """
+        first, last = df.index[0].value // 1_000_000, df.index[-1].value // 1_000_000
+        fp = cache_dir / f"part-{first:013d}-{last:013d}.parquet"
+        tmp = cache_dir / f".tmp-{fp.name}"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=True), tmp, **self.PARQUET_OPTS)
+        os.replace(tmp, fp)
+        return fp
+
+    def _persist(self, tf: str, cache_dir, full: pd.DataFrame):
+        """
+        마감된 봉 중 아직 파일에 기록되지 않은 행만 캐시 디렉토리에 새 조각 파일로 기록합니다.
+
+        마지막 행은 아직 진행 중인 봉이므로 기록하지 않습니다. 조각 파일이 `COMPACT_EVERY`개에 도달하면,
+        마감된 보관 구간 전체를 파일 하나로 기록한 뒤 나머지 조각 파일을 지웁니다.
+        """
+        closed = full.iloc[:-1]
+        last = self._persisted_ts.get(tf)
+        new = closed if last is None else closed[closed.index > last]
+        if new.empty:
+            return
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        if self._parts.get(tf, 0) + 1 >= self.COMPACT_EVERY:
+            keep = self._write_part(cache_dir, closed)
+            for f in self._part_files(cache_dir):
+                if f != keep:
+                    f.unlink(missing_ok=True)
+            self._parts[tf] = 1
+        else:
+            self._write_part(cache_dir, new)
+            self._parts[tf] = self._parts.get(tf, 0) + 1
+        self._persisted_ts[tf] = closed.index[-1]
+
+    def _prepare_fetch(self, tf: str, limit: int) -> tuple:
+        """
+        거래소 조회 전에 필요한 캐시 디렉토리 경로, 메모리 캐시, 요청 시작 시각(`since`)과 요청 개수를 준비합니다.
+
+        메모리 캐시가 없을 때만 캐시 디렉토리를 한 번 읽어옵니다.
+
+        Returns:
+            tuple: (캐시 디렉토리 경로, 캐시된 데이터프레임, since(ms) 또는 None, 요청할 봉 개수)
+        """
+        # 심볼과 타임프레임을 조합하여 캐시 디렉토리 경로를 생성합니다. (예: data/BTC_USDT_15m/)
+        fp = CFG.DATA_DIR / f"{self.symbol.replace('/', '_')}_{tf}"
+
+        # 메모리 캐시가 없을 때만 파일을 읽어옵니다. 파일이 없으면 빈 데이터프레임을 사용합니다.
+        cached = self._cache.get(tf)
+        if cached is None:
+            cached = self._cache[tf] = self._load_cache(fp)
+            self._parts[tf] = len(self._part_files(fp))
+            if len(cached):
+                self._persisted_ts[tf] = cached.index[-1]
+
+        # 캐시된 데이터가 2개 이상 있을 경우, 마지막에서 두 번째 봉의 타임스탬프를 `since`로 설정합니다.
+        # 이렇게 하면 마지막 봉이 미완성 상태일 경우에도 누락 없이 데이터를 이어받을 수 있습니다.
+        since = int(cached.index[-2].value / 1e6) if len(cached) > 2 else None
+        # `since` 값이 있으면 최신 2개 봉만, 없으면(최초 조회) `limit` 개수만큼 요청합니다.
+        need = 2 if since else limit
+        return fp, cached, since, need
+
+    def _backfill_plan(self, tf: str, need: int) -> tuple:
+        """
+        최초 조회 시 여러 번에 나눠 요청해야 하는지 판단하고, 첫 요청 시작 시각과 봉 간격을 계산합니다.
+
+        한 번에 받을 수 있는 캔들 수(`ohlcv_candle_limit`)가 `need` 이상이면 한 번만 요청합니다 (since=None).
+        그렇지 않으면 `need`개 봉 이전 시각부터 시작해 앞으로(최신 방향으로) 페이지를 넘기며 요청합니다.
+
+        Returns:
+            tuple: (1회 요청 최대 캔들 수, 첫 요청 시작 시각(ms) 또는 None, 봉 간격(ms))
+        """
+        cap = getattr(self.exchange, "ohlcv_candle_limit", self.DEFAULT_CANDLE_LIMIT)
+        if need <= cap:
+            return cap, None, 0
+        tf_ms = ccxt.Exchange.parse_timeframe(tf) * 1000
+        return cap, int(time.time() * 1000) - need * tf_ms, tf_ms
+
+    def _fetch_rows(self, tf: str, since, need: int) -> list:
+        """거래소에서 OHLCV 행을 조회합니다. 최초 조회가 1회 한도를 넘으면 여러 번에 나눠 요청합니다."""
+        if since:
+            cap = getattr(self.exchange, "ohlcv_candle_limit", self.DEFAULT_CANDLE_LIMIT)
+            return self.exchange.fetch_ohlcv(self.symbol, tf, since=since, limit=min(need, cap))
+        cap, start, tf_ms = self._backfill_plan(tf, need)
+        if start is None:
+            return self.exchange.fetch_ohlcv(self.symbol, tf, since=None, limit=need)
+        rows = []
+        while len(rows) < need:
+            batch = self.exchange.fetch_ohlcv(self.symbol, tf, since=start, limit=cap)
+            rows.extend(batch)
+            if len(batch) < cap:
+                break  # 현재 시각까지 모두 받았습니다.
+            start = batch[-1][0] + tf_ms
+        return rows
+
+    async def _fetch_rows_async(self, tf: str, since, need: int) -> list:
+        """`_fetch_rows`의 비동기 버전."""
+        if since:
+            cap = getattr(self.exchange, "ohlcv_candle_limit", self.DEFAULT_CANDLE_LIMIT)
+            return await self.exchange.fetch_ohlcv_async(self.symbol, tf, since=since, limit=min(need, cap))
+        cap, start, tf_ms = self._backfill_plan(tf, need)
+        if start is None:
+            return await self.exchange.fetch_ohlcv_async(self.symbol, tf, since=None, limit=need)
+        rows = []
+        while len(rows) < need:
+            batch = await self.exchange.fetch_ohlcv_async(self.symbol, tf, since=start, limit=cap)
+            rows.extend(batch)
+            if len(batch) < cap:
+                break  # 현재 시각까지 모두 받았습니다.
+            start = batch[-1][0] + tf_ms
+        return rows
+
+    def _store_rows(self, tf: str, fp, cached: pd.DataFrame, rows: list, limit: int) -> pd.DataFrame:
+        """거래소에서 받은 OHLCV 행을 메모리 캐시에 합치고, 새로 마감된 봉을 파일에 기록합니다."""
+        # ccxt가 반환한 리스트를 한 번에 연속된 float64 배열로 변환한 뒤, 컬럼별 배열로 데이터프레임을 만듭니다.
+        # 행 단위 자료형 추론이나 object 자료형 중간 결과 없이 생성됩니다.
+        arr = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        # 타임스탬프(ms)를 datetime 인덱스로 변환합니다.
+        idx = pd.DatetimeIndex(pd.to_datetime(arr[:, 0].astype(np.int64), unit="ms"), name="ts")
+        df_new = pd.DataFrame({"open": arr[:, 1], "high": arr[:, 2], "low": arr[:, 3],
+                               "close": arr[:, 4], "volume": arr[:, 5]}, index=idx)
+
+        # 기존 캐시 데이터와 새로 받은 데이터를 메모리에서 합칩니다.
+        full = pd.concat([cached, df_new])
+        # 인덱스(시간) 기준으로 중복된 데이터를 제거하되, 마지막 값(최신 데이터)을 유지합니다.
+        # 메모리 캐시는 최근 `KEEP_ROWS`개 봉만 남겨, 장시간 실행해도 크기가 늘어나지 않도록 합니다.
+        full = full[~full.index.duplicated(keep="last")].iloc[-max(limit, self.KEEP_ROWS):]
+        self._cache[tf] = full
+
+        # 새로 마감된 봉만 캐시 파일에 이어 씁니다.
+        self._persist(tf, fp, full)
+
+        # 최종적으로 최신 `limit` 개수의 데이터만 잘라서 반환합니다.
+        return full.tail(limit)
+
+    @staticmethod
+    def _fetch_failed(tf: str, e: Exception, cached: pd.DataFrame, limit: int) -> pd.DataFrame:
+        """조회 실패를 로그로 남기고, 현재까지 캐시된 데이터를 반환합니다."""
+        if isinstance(e, ccxt.NetworkError):
+            logging.warning(f"Network error while fetching {tf} data: {e}. Returning cached data.")
+        else:
+            logging.error(f"Failed to fetch {tf} data: {e}. Returning cached data.")
+        return cached.tail(limit)
 
     def _fetch_cache(self, tf: str, limit: int = 500) -> pd.DataFrame:
         """
         지정된 타임프레임의 데이터를 조회하고 로컬에 캐싱하는 내부 메서드.
 
-        1. 로컬 캐시(Parquet 파일)가 있는지 확인하고, 있다면 불러옵니다.
+        1. 메모리 캐시가 없으면 로컬 캐시(Parquet 파일)를 한 번 불러옵니다.
         2. 캐시된 데이터의 마지막 시간부터 현재까지의 최신 데이터를 거래소에 요청합니다.
-           - 캐시가 없는 경우, `limit` 개수만큼의 과거 데이터를 요청합니다.
+           - 캐시가 없는 경우, `limit` 개수만큼의 과거 데이터를 요청합니다. 거래소의 1회 조회 한도
+             (`ohlcv_candle_limit`)보다 많으면 여러 번에 나눠 요청합니다 (`_fetch_rows`).
            - 캐시가 있는 경우, 중복을 피하기 위해 마지막 2개 봉부터 요청하여 최신 데이터를 보충합니다.
-        3. 새로 받은 데이터와 기존 캐시 데이터를 합치고, 중복을 제거한 후 다시 Parquet 파일로 저장합니다.
+        3. 새로 받은 데이터와 기존 캐시 데이터를 메모리에서 합치고, 같은 시각의 행은 최신 값만 남깁니다.
+           파일에는 새로 마감된 봉만 새 조각 파일로 추가합니다 (`_persist`).
         4. 최종적으로 `limit` 개수만큼의 최신 데이터를 데이터프레임으로 반환합니다.
 
         네트워크 오류 등 예외 발생 시, API 요청은 실패하지만 프로그램이 중단되지 않고
@@ -53,86 +274,170 @@ class IndicatorRepository:
         Returns:
             pd.DataFrame: 요청된 타임프레임의 OHLCV 데이터프레임.
         """
-        from pathlib import Path
-        # 심볼과 타임프레임을 조합하여 캐시 파일 경로를 생성합니다. (예: data/BTC_USDT_15m.parquet)
-        fp = CFG.DATA_DIR / f"{self.symbol.replace('/', '_')}_{tf}.parquet"
-
-        # 파일이 존재하면 읽어오고, 없으면 빈 데이터프레임을 생성합니다.
-        cached = pd.read_parquet(fp) if fp.exists() else pd.DataFrame()
-
-        # 캐시된 데이터가 2개 이상 있을 경우, 마지막에서 두 번째 봉의 타임스탬프를 `since`로 설정합니다.
-        # 이렇게 하면 마지막 봉이 미완성 상태일 경우에도 누락 없이 데이터를 이어받을 수 있습니다.
-        since = int(cached.index[-2].value / 1e6) if len(cached) > 2 else None
-
+        fp, cached, since, need = self._prepare_fetch(tf, limit)
         try:
-            # `since` 값이 있으면 최신 2개 봉만, 없으면(최초 조회) `limit` 개수만큼 요청합니다.
-            need = 2 if since else limit
             # 거래소 클라이언트를 통해 OHLCV 데이터를 조회합니다.
-            rows = self.exchange.fetch_ohlcv(self.symbol, tf, since=since, limit=need)
+            rows = self._fetch_rows(tf, since, need)
+            return self._store_rows(tf, fp, cached, rows, limit)
+        except Exception as e:
+            return self._fetch_failed(tf, e, cached, limit)
 
-            # ccxt가 반환한 리스트를 pandas 데이터프레임으로 변환합니다.
-            df_new = pd.DataFrame(rows, columns=["ts", "open", "high", "low", "close", "volume"])
-            # 타임스탬프(ms)를 datetime 객체로 변환하고 인덱스로 설정합니다.
-            df_new["ts"] = pd.to_datetime(df_new["ts"], unit="ms")
-            df_new.set_index("ts", inplace=True)
+    async def _fetch_cache_async(self, tf: str, limit: int = 500) -> pd.DataFrame:
+        """
+        `_fetch_cache`의 비동기 버전. 거래소 조회만 `await`로 수행하고, 나머지 처리는 동일합니다.
+        """
+        fp, cached, since, need = self._prepare_fetch(tf, limit)
+        try:
+            rows = await self._fetch_rows_async(tf, since, need)
+            return self._store_rows(tf, fp, cached, rows, limit)
+        except Exception as e:
+            return self._fetch_failed(tf, e, cached, limit)
 
-            # 기존 캐시 데이터와 새로 받은 데이터를 합칩니다.
-            full = pd.concat([cached, df_new])
-            # 인덱스(시간) 기준으로 중복된 데이터를 제거하되, 마지막 값(최신 데이터)을 유지합니다.
-            full = full.drop_duplicates(keep="last")
+    @staticmethod
+    def _fingerprint(raw: pd.DataFrame):
+        """
+        OHLCV 데이터가 바뀌었는지 판단하기 위한 지문을 만듭니다.
 
-            # 업데이트된 전체 데이터를 다시 Parquet 파일로 저장하여 캐시를 갱신합니다.
-            full.to_parquet(fp)
+        조회 구간의 첫/마지막 봉 시각과 마지막 봉(진행 중인 봉)의 값이 같으면, 그 이전 봉들은
+        이미 마감되어 바뀌지 않으므로 같은 데이터로 간주합니다.
+        """
+        if raw.empty:
+            return None
+        return raw.index[0], raw.index[-1], tuple(raw.to_numpy()[-1])
 
-            # 최종적으로 최신 `limit` 개수의 데이터만 잘라서 반환합니다.
-            return full.tail(limit)
-        except ccxt.NetworkError as e:
-            logging.warning(f"Network error while fetching {tf} data: {e}. Returning cached data.")
-            return cached.tail(limit)
-        except Exception as e:
-            logging.error(f"Failed to fetch {tf} data: {e}. Returning cached data.")
-            return cached.tail(limit)
+    def _indicators(self, tf: str, raw: pd.DataFrame) -> tuple:
+        """
+        타임프레임 데이터가 바뀐 경우에만 지표를 계산합니다. 계산은 타임프레임별 `IndicatorEngine`이
+        새로 마감된 봉과 진행 중인 봉에 대해서만 수행합니다.
+
+        Args:
+            tf (str): 타임프레임 (예: '15m', '1h').
+            raw (pd.DataFrame): `_fetch_cache`로 조회한 OHLCV 데이터프레임.
+
+        Returns:
+            tuple: (원본 데이터 지문, 지표가 추가된 데이터프레임)
+        """
+        key = self._fingerprint(raw)
+        hit = self._ind.get(tf)
+        if hit is not None and hit[0] == key:
+            return hit
+        engine = self._engines.get(tf)
+        if engine is None:
+            engine = self._engines[tf] = IndicatorEngine()
+        self._ind[tf] = (key, engine.update(raw))
+        return self._ind[tf]
 
     def get_merged(self) -> pd.DataFrame:
         """
         모든 타임프레임의 데이터를 조회, 처리, 병합하여 최종 피처(feature) 데이터프레임을 생성합니다.
 
-        1. `_fetch_cache`를 사용하여 15분, 1시간, 4시간 봉 데이터를 각각 가져옵니다.
-        2. 각 데이터프레임에 `add_indicators` 헬퍼 함수를 사용하여 기술적 지표를 추가합니다.
-        3. 1시간과 4시간 데이터를 15분 간격으로 리샘플링합니다. `ffill()`(forward-fill)을 사용하여
-           상위 타임프레임의 값이 해당 시간 동안 유지되도록 채웁니다.
-           (예: 1시의 1h RSI 값은 1:00, 1:15, 1:30, 1:45에 모두 동일하게 적용됨)
-        4. 15분 데이터를 기준으로, 리샘플링된 상위 타임프레임의 특정 지표들을 컬럼으로 추가합니다.
-        5. 머신러닝 모델의 정답(label)으로 사용될 'target' 컬럼을 생성합니다.
-           (다음 15분 봉의 종가가 현재 종가보다 높으면 1, 아니면 0)
-        6. 결측치(NaN)가 있는 행을 모두 제거하고 최종 데이터프레임을 반환합니다.
+        1. `_fetch_cache`를 사용하여 15분, 1시간, 4시간 봉 데이터를 스레드 풀에서 동시에 가져옵니다.
+           (비동기 루프에서는 `get_merged_async`를 사용합니다.)
+        2. 이후 처리는 `_merge`를 참고하세요.
+
+        Returns:
+            pd.DataFrame: 멀티-타임프레임 지표가 모두 병합된 최종 데이터프레임.
+        """
+        futs = [self._pool.submit(self._fetch_cache, tf) for tf in ("15m", "1h", "4h")]
+        return self._merge(*(f.result() for f in futs))
+
+    async def get_merged_async(self) -> pd.DataFrame:
+        """
+        `get_merged`의 비동기 버전. 세 타임프레임의 조회를 `asyncio.gather`로 동시에 요청합니다.
+
+        조회 비용은 대부분 네트워크 왕복 시간이므로, 순차 조회(3 × RTT)가 약 1 × RTT로 줄어듭니다.
 
         Returns:
             pd.DataFrame: 멀티-타임프레임 지표가 모두 병합된 최종 데이터프레임.
         """
-        # 1. 각 타임프레임 데이터 조회 및 지표 추가
-        df15 = add_indicators(self._fetch_cache("15m"))
+        raw15, raw1h, raw4h = await asyncio.gather(
+            self._fetch_cache_async("15m"), self._fetch_cache_async("1h"), self._fetch_cache_async("4h"))
+        return self._merge(raw15, raw1h, raw4h)
+
+    def _merge(self, raw15: pd.DataFrame, raw1h: pd.DataFrame, raw4h: pd.DataFrame) -> pd.DataFrame:
+        """
+        조회한 세 타임프레임의 OHLCV 데이터로 최종 피처 데이터프레임을 만듭니다.
+
+        1. 각 데이터프레임에 `IndicatorEngine`을 사용하여 기술적 지표를 추가합니다.
+        2. merge_asof(direction="backward")와 같은 방식으로 각 15분 봉 시각에 대해 그 시각 이하의 가장 최근
+           1시간/4시간 봉의 지표를 붙입니다. 상위 타임프레임의 값이 해당 시간 동안 유지됩니다.
+           (예: 1시의 1h RSI 값은 1:00, 1:15, 1:30, 1:45에 모두 동일하게 적용됨)
+           15분 간격 인덱스를 새로 만들어 채우는 리샘플링 없이, 정렬된 인덱스에 대한 이진 탐색으로 병합합니다.
+        3. 15분 데이터를 기준으로, 상위 타임프레임의 특정 지표들을 컬럼으로 추가합니다.
+        4. 머신러닝 모델의 정답(label)으로 사용될 'target' 컬럼을 생성합니다.
+           (다음 15분 봉의 종가가 현재 종가보다 높으면 1, 아니면 0)
+        5. 상위 타임프레임 값이 없는 앞부분 행을 잘라내고, 지표 컬럼을 float32, target을 int8로 맞춘
+           numpy 배열들로 데이터프레임을 한 번에 만들어 반환합니다.
 
-        # 2. 상위 타임프레임 데이터 조회, 지표 추가, 리샘플링
-        df1h = add_indicators(self._fetch_cache("1h")).resample("15T").ffill()
-        df4h = add_indicators(self._fetch_cache("4h")).resample("15T").ffill()
+        각 타임프레임의 지표 계산 결과는 원본 데이터가 바뀐 경우에만 다시 계산하며(`_indicators`),
+        세 타임프레임 모두 바뀌지 않았다면 이전에 병합한 결과를 그대로 반환합니다.
+        반환된 데이터프레임은 캐시와 공유되므로 호출자는 수정하지 말아야 합니다.
+        """
+        # 1. 각 타임프레임 지표 추가
+        k15, df15 = self._indicators("15m", raw15)
+        k1h, df1h = self._indicators("1h", raw1h)
+        k4h, df4h = self._indicators("4h", raw4h)
 
         # 데이터가 하나라도 비어있으면 오류를 발생시켜 시스템 중단을 방지합니다.
         if df15.empty or df1h.empty or df4h.empty:
             raise ValueError("Failed to fetch sufficient data for one or more timeframes.")
 
-        # 3. 데이터 병합
-        base = df15.copy()
+        # 어느 타임프레임의 데이터도 바뀌지 않았다면 이전 병합 결과를 재사용합니다.
+        key = (k15, k1h, k4h)
+        if key == self._merged_key:
+            return self._merged
+
+        # 2. 데이터 병합
         # 15분봉 데이터에 1시간봉의 RSI와 4시간봉의 EMA 값들을 새로운 컬럼으로 추가합니다.
-        base["rsi_1h"] = df1h["rsi"]
-        base["ema_fast_4h"] = df4h["ema_fast"]
-        base["ema_slow_4h"] = df4h["ema_slow"]
-
-        # 4. 타겟(정답) 변수 생성
-        # `shift(-1)`은 다음 행의 값을 현재 행으로 가져옵니다.
-        # 즉, 다음 15분 봉의 종가가 현재 종가보다 높은지를 비교하여 target 값을 결정합니다.
-        base["target"] = (base["close"].shift(-1) > base["close"]).astype(int)
-
-        # 5. 결측치 제거 후 반환
-        # 리샘플링이나 지표 추가 과정에서 발생할 수 있는 모든 결측치를 제거하여 모델 학습에 문제가 없도록 합니다.
-        return base.dropna()
+        # 각 15분 봉에는 그 시각 이하에서 가장 최근에 시작한 상위 타임프레임 봉의 값이 붙습니다.
+        # 세 인덱스 모두 정렬되어 있으므로 `searchsorted(side="right") - 1`이 merge_asof(backward)와 같은 위치를 줍니다.
+        idx = df15.index
+        pos1h = df1h.index.searchsorted(idx, side="right") - 1
+        pos4h = df4h.index.searchsorted(idx, side="right") - 1
+        # 상위 타임프레임 봉이 아직 없는 앞부분 행(병합 시 NaN이 되는 행)은 잘라냅니다.
+        # 지표 계산 결과에는 워밍업 구간이 이미 제외되어 있으므로 이것이 유일한 결측치이며, dropna 대신 경계 슬라이스로 처리합니다.
+        start = max(int(np.searchsorted(pos1h, 0)), int(np.searchsorted(pos4h, 0)))
+        idx, pos1h, pos4h = idx[start:], pos1h[start:], pos4h[start:]
+
+        # 출력 스키마가 매 주기 동일하므로, 자료형을 미리 맞춘 numpy 배열의 딕셔너리로 한 번에 데이터프레임을 만듭니다.
+        # 컬럼을 하나씩 대입하며 블록을 나누고 다시 합치는 과정이 생기지 않습니다.
+        # 지표 컬럼은 float32로 줄여, 이후 예측/신호 계산과 UI 공유에서 읽고 복사하는 바이트 수를 절반으로 줄입니다.
+        f32 = set(self.FLOAT32_COLS)
+        data = {c: df15[c].to_numpy(np.float32 if c in f32 else None, copy=False)[start:] for c in df15.columns}
+        data["rsi_1h"] = df1h["rsi"].to_numpy(np.float32, copy=False)[pos1h]
+        data["ema_fast_4h"] = df4h["ema_fast"].to_numpy(np.float32, copy=False)[pos4h]
+        data["ema_slow_4h"] = df4h["ema_slow"].to_numpy(np.float32, copy=False)[pos4h]
+
+        # 3. 타겟(정답) 변수 생성
+        # 다음 15분 봉의 종가가 현재 종가보다 높은지를 비교하여 target 값을 결정합니다.
+        # 다음 봉이 없는 마지막 행은 0이며, 이 행은 현재 봉의 신호 계산에 필요하므로 제거하지 않습니다.
+        close = data["close"]
+        target = np.zeros(len(close), dtype=np.int8)
+        np.greater(close[1:], close[:-1], out=target[:-1])
+        data["target"] = target
+
+        # 4. 데이터프레임 구성 후 반환
+        base = pd.DataFrame(data, index=idx, copy=False)
+        self._merged, self._merged_key = base, key
+        return self._merged
+
+    @staticmethod
+    def _to_soa(df: pd.DataFrame) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """데이터프레임을 ({컬럼 이름: 값 배열}, 타임스탬프 배열) 형태로 변환합니다."""
+        return {col: df[col].to_numpy() for col in df.columns}, df.index.to_numpy()
+
+    def get_merged_soa(self) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """
+        `get_merged`의 결과를 컬럼별 numpy 배열(SoA, Structure of Arrays) 형태로 반환합니다.
+
+        메인 루프는 이 배열들만으로 예측/신호/주문을 처리하므로, 이후 단계에서 데이터프레임을
+        다시 만들거나 컬럼을 추가하는 비용이 들지 않습니다. 데이터프레임은 대시보드가 그릴 때만 만들어집니다.
+
+        Returns:
+            tuple[dict[str, np.ndarray], np.ndarray]: ({컬럼 이름: 값 배열}, 타임스탬프 배열)
+        """
+        return self._to_soa(self.get_merged())
+
+    async def get_merged_soa_async(self) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """`get_merged_soa`의 비동기 버전. 메인 루프에서 사용합니다."""
+        return self._to_soa(await self.get_merged_async())
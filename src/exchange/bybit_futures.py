@@ -5,9 +5,11 @@ Bybit USDT-Perpetual Futures 거래소 클라이언트 구현체.
 실제 상호작용을 담당하는 구체적인 클래스 `BybitFutures`를 정의합니다.
 `ccxt` 라이브러리를 사용하여 바이빗 API를 호출하는 로직이 포함됩니다.
 """
+import time
 import logging
 import ccxt
-from src.exchange.exchange_client import ExchangeClient
+import ccxt.pro as ccxtpro
+from src.exchange.exchange_client import ExchangeClient, SELL
 
 class BybitFutures(ExchangeClient):
     """
@@ -16,6 +18,12 @@ class BybitFutures(ExchangeClient):
     `ccxt` 라이브러리의 바이빗 인스턴스를 내부적으로 사용하여,
     추상 메서드에서 정의된 기능들을 실제 API 호출로 연결합니다.
     """
+
+    # 펀딩비 캐시 유지 시간(초). 펀딩비는 수 시간 간격으로만 바뀌므로, 이 시간 동안은 API를 다시 호출하지 않습니다.
+    FUNDING_TTL_SEC = 60
+    # `fetch_ohlcv` 한 번에 받을 수 있는 최대 캔들 수 (v5 kline 기준). 더 많이 요청하면 잘려서 반환됩니다.
+    ohlcv_candle_limit = 200
+
     def __init__(self, key: str, secret: str):
         """
         BybitFutures 클라이언트 인스턴스를 초기화합니다.
@@ -33,8 +41,16 @@ class BybitFutures(ExchangeClient):
                 "defaultType": "future"  # 모든 주문 및 API 호출의 기본 타입을 선물(future)로 지정합니다.
             }
         })
-        # `fetch_time()`을 호출하여 API 서버와의 연결 및 인증 정보의 유효성을 테스트합니다.
-        self.client.fetch_time()
+        # 마켓 정보를 한 번만 불러와 API 서버와의 연결을 확인하고, 심볼별 가격 정밀도를 미리 계산해 둡니다.
+        # 이후 `get_price_precision`은 API 호출 없이 이 캐시에서 값을 반환합니다.
+        self.client.load_markets()
+        self._precision_cache = {s: int(m["precision"]["price"]) for s, m in self.client.markets.items()
+                                 if m.get("precision", {}).get("price") is not None}
+        # 비동기(asyncio) 호출용 ccxt.pro 클라이언트. 웹소켓 구독(`watch_ohlcv`)과 비동기 REST 조회
+        # (`fetch_ohlcv_async`)에 함께 사용되며, 첫 호출 시 생성됩니다.
+        self.ws_client = None
+        # 심볼별 펀딩비 캐시. {심볼: (조회 시각(monotonic), 펀딩비)}
+        self._funding_cache: dict[str, tuple[float, float]] = {}
         logging.info("Bybit Futures exchange client initialized successfully.")
 
     def set_leverage(self, symbol: str, leverage: int, isolated: bool):
@@ -56,11 +72,34 @@ class BybitFutures(ExchangeClient):
         """
         return self.client.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
 
+    def _async_client(self):
+        """
+        비동기 ccxt.pro 클라이언트를 반환합니다.
+
+        비동기 클라이언트는 자신을 사용하는 asyncio 이벤트 루프 안에서 만들어져야 하므로, 첫 호출 시점에 생성합니다.
+        공개 시세 데이터만 조회/구독하므로 API 키는 필요하지 않습니다.
+        """
+        if self.ws_client is None:
+            self.ws_client = ccxtpro.bybit({"enableRateLimit": True, "options": {"defaultType": "future"}})
+        return self.ws_client
+
+    async def fetch_ohlcv_async(self, symbol: str, timeframe: str, since=None, limit: int = 500) -> list:
+        """
+        비동기 클라이언트로 OHLCV 데이터를 가져옵니다. 요청 속도 제한(`enableRateLimit`)은 클라이언트가 지킵니다.
+        """
+        return await self._async_client().fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+
+    async def watch_ohlcv(self, symbol: str, timeframe: str) -> list:
+        """
+        `ccxt.pro`의 `watch_ohlcv`로 웹소켓 캔들 스트림을 구독합니다.
+        """
+        return await self._async_client().watch_ohlcv(symbol, timeframe)
+
     def create_market_order(self, symbol: str, side: str, qty: float) -> dict:
         """
         `ccxt`의 `create_order`를 사용하여 시장가 주문을 생성합니다.
         """
-        return self.client.create_order(symbol=symbol, type="MARKET", side=side.upper(), amount=qty)
+        return self.client.create_order(symbol=symbol, type="MARKET", side=side, amount=qty)
 
     def create_exit_order(self, symbol: str, side: str, qty: float, stop_price: float, tp: bool = True) -> dict:
         """
@@ -82,7 +121,7 @@ class BybitFutures(ExchangeClient):
         order_type = "TAKE_PROFIT_MARKET" if tp else "STOP_MARKET"
 
         # 조건에 따른 triggerDirection 계산
-        is_sell_order = side.upper() == "SELL"
+        is_sell_order = side == SELL
         if (tp and is_sell_order) or (not tp and not is_sell_order):
             trigger_dir = 1  # Rise
         else:
@@ -96,7 +135,7 @@ class BybitFutures(ExchangeClient):
         return self.client.create_order(
             symbol=symbol,
             type=order_type,
-            side=side.upper(),
+            side=side,
             amount=qty,
             params=params
         )
@@ -108,20 +147,32 @@ class BybitFutures(ExchangeClient):
         암시적 API 호출 대신 이 메서드를 사용할 수 있습니다.
         (주: 원래 코드에서는 0.0을 반환했으나, 보다 정확한 구현으로 수정)
         """
+        # `FUNDING_TTL_SEC` 이내에 조회한 값이 있으면 API를 호출하지 않고 그대로 반환합니다.
+        now = time.monotonic()
+        cached = self._funding_cache.get(symbol)
+        if cached and now - cached[0] < self.FUNDING_TTL_SEC:
+            return cached[1]
         try:
             # ccxt의 통합된(unified) 메서드 사용
             rate_info = self.client.fetch_funding_rate(symbol)
-            return float(rate_info.get("fundingRate", 0.0))
+            rate = float(rate_info.get("fundingRate", 0.0))
+            self._funding_cache[symbol] = (now, rate)
+            return rate
         except Exception:
             # API 호출 실패 시 0.0을 반환합니다.
             return 0.0
 
     def get_price_precision(self, symbol: str) -> int:
         """
-        `ccxt`의 `market` 정보를 사용하여 가격 정밀도를 가져옵니다.
+        초기화 시 `load_markets`로 계산해 둔 가격 정밀도를 반환합니다.
+
+        'BTC/USDT'처럼 통합 심볼이 아닌 별칭으로 조회하면, 이미 불러온 마켓 정보에서 한 번 찾아 캐시에 추가합니다.
+        (`market()`은 마켓 정보가 로드되어 있으면 API를 호출하지 않습니다.)
         """
-        market = self.client.market(symbol)
-        return int(market["precision"]["price"])
+        precision = self._precision_cache.get(symbol)
+        if precision is None:
+            precision = self._precision_cache[symbol] = int(self.client.market(symbol)["precision"]["price"])
+        return precision
 
     def fetch_position(self, symbol: str) -> dict:
         """
@@ -15,6 +15,10 @@
 """
 import abc
 
+# 주문 방향 상수. 호출자는 이 상수를 그대로 넘기며, 구현체는 대소문자 변환 없이 ccxt에 전달합니다.
+BUY = "BUY"
+SELL = "SELL"
+
 class ExchangeClient(abc.ABC):
     """
     모든 거래소 클라이언트가 상속받아야 하는 추상 기본 클래스 (C#의 Interface와 유사).
@@ -39,6 +43,36 @@ class ExchangeClient(abc.ABC):
         """
         ...
 
+    @abc.abstractmethod
+    async def fetch_ohlcv_async(self, symbol: str, timeframe: str, since=None, limit: int = 500) -> list:
+        """
+        `fetch_ohlcv`의 비동기 버전. 여러 타임프레임을 `asyncio.gather`로 동시에 조회할 때 사용합니다.
+
+        Args:
+            symbol (str): 거래 페어 (예: 'BTC/USDT').
+            timeframe (str): 캔들 봉의 시간 간격 (예: '15m', '1h', '4h').
+            since (int, optional): 데이터를 가져오기 시작할 타임스탬프 (ms 단위). Defaults to None.
+            limit (int, optional): 가져올 캔들 봉의 최대 개수. Defaults to 500.
+
+        Returns:
+            list: `fetch_ohlcv`와 같은 [timestamp, open, high, low, close, volume] 형식의 리스트.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def watch_ohlcv(self, symbol: str, timeframe: str) -> list:
+        """
+        웹소켓으로 OHLCV 데이터를 구독합니다. 새 캔들 데이터(진행 중인 봉의 갱신 포함)가 도착할 때마다 반환됩니다.
+
+        Args:
+            symbol (str): 거래 페어 (예: 'BTC/USDT').
+            timeframe (str): 캔들 봉의 시간 간격 (예: '15m').
+
+        Returns:
+            list: `fetch_ohlcv`와 같은 [timestamp, open, high, low, close, volume] 형식의 리스트.
+        """
+        ...
+
     @abc.abstractmethod
     def create_market_order(self, symbol: str, side: str, qty: float) -> dict:
         """
@@ -46,7 +80,7 @@ class ExchangeClient(abc.ABC):
 
         Args:
             symbol (str): 주문할 거래 페어.
-            side (str): 주문 방향 ('buy' 또는 'sell').
+            side (str): 주문 방향 (`BUY` 또는 `SELL`).
             qty (float): 주문 수량.
 
         Returns:
@@ -74,7 +108,7 @@ class ExchangeClient(abc.ABC):
 
         Args:
             symbol (str): 주문할 거래 페어.
-            side (str): 주문 방향 ('buy' 또는 'sell'). 롱 포지션 종료는 'sell', 숏 포지션 종료는 'buy'가 됩니다.
+            side (str): 주문 방향 (`BUY` 또는 `SELL`). 롱 포지션 종료는 `SELL`, 숏 포지션 종료는 `BUY`가 됩니다.
             qty (float): 주문 수량.
             stop_price (float): 주문이 발동될 트리거 가격.
             tp (bool, optional): True이면 이익 실현(Take-Profit) 주문, False이면 손절(Stop-Loss) 주문. Defaults to True.
@@ -1,9 +1,10 @@
 """
 포지션 및 주문 관리를 총괄하는 서비스.
 
-이 클래스는 현재 포지션 상태(`self.pos`), 잔고(`self.balance`), 거래 내역(`self.trades`) 등을 관리하며,
+이 클래스는 현재 포지션 상태(`self.pos`, 내부적으로는 포지션별 numpy 배열), 잔고(`self.balance`), 거래 내역(`self.trades`) 등을 관리하며,
 라이브 트레이딩과 페이퍼 트레이딩(모의 투자)을 모두 지원합니다.
 모든 공개 메서드는 스레드로부터 안전하게(thread-safe) 호출될 수 있도록 `threading.Lock`을 사용합니다.
+포지션/잔고용 잠금과 리스크 관리(연속 손실, 거래 중단)용 잠금을 나누어, 서로 관계없는 작업이 기다리지 않게 합니다.
 
 주요 책임:
 - **포지션 진입 (`open_position`)**: 새로운 롱 또는 숏 포지션을 엽니다.
@@ -12,22 +13,38 @@
 - **TP/SL 주문 부착 (`_attach_tp_sl`)**: 포지션 진입 후, 자동으로 이익 실현(TP) 및 손절(SL) 주문을 거래소에 전송합니다.
 - **포지션 종료 확인**:
   - 페이퍼 모드 (`poll_position_closed`): 현재 가격이 TP/SL 가격에 도달했는지 지속적으로 확인(polling)하여 포지션을 종료시킵니다.
+    모든 포지션의 TP/SL 도달 여부를 하나의 numpy 마스크 연산으로 판정하므로, 다중 심볼로 확장해도 비용이 거의 늘지 않습니다.
   - 라이브 모드: 거래소에 부착된 TP/SL 주문이 체결되면, `sync_position`을 통해 포지션이 사라진 것을 감지합니다.
 - **손익(PnL) 계산 (`_pnl`)**: 포지션 종료 시 손익을 계산합니다.
 - **리스크 관리 (`is_paused`)**: 설정된 횟수(`CFG.MAX_LOSS`)만큼 연속 손실이 발생하면,
   설정된 시간(`CFG.PAUSE_HR`) 동안 신규 거래를 중단시킵니다.
 - **상태 동기화 (`sync_position`)**: 라이브 모드에서 내부 포지션 상태와 실제 거래소의 포지션 상태가 일치하는지 주기적으로 확인하고 동기화합니다.
 """
+import time
 import logging
 import threading
-from datetime import datetime, timedelta
+import numpy as np
+from typing import NamedTuple
+from datetime import datetime, timedelta, timezone
 from config.config import CFG
 from src.utils.helpers import tg
-from src.exchange.exchange_client import ExchangeClient
+from src.bot._fast import tp_sl_hit
+from src.exchange.exchange_client import ExchangeClient, BUY, SELL
+
+class Position(NamedTuple):
+    """`OrderService.pos`가 반환하는 포지션 정보. 필드는 속성으로 접근합니다 (예: `pos.entry`)."""
+    entry: float  # 진입 가격
+    qty: float    # 수량
+    side: str     # "long" 또는 "short"
+    sign: int     # 방향 부호 (롱: +1, 숏: -1)
+
 
 class OrderService:
     """포지션 관리, 주문 실행, 리스크 관리 등을 담당하는 클래스."""
 
+    # 거래 내역(`trades`)의 컬럼.
+    TRADE_COLS = ("time", "side", "price", "bal", "pnl")
+
     def __init__(self, ex: ExchangeClient, paper: bool = True, init_balance: float = 0.0):
         """
         OrderService 인스턴스를 초기화합니다.
@@ -41,29 +58,100 @@ class OrderService:
         self.paper = paper
         self.balance = init_balance
 
-        # 현재 포지션 정보. 없으면 None. 예: {"entry": 30000, "qty": 0.01, "side": "long"}
-        self.pos = None
-        # 모든 거래(진입/종료) 기록을 저장하는 리스트.
-        self.trades = []
+        # 포지션 정보를 포지션별 병렬 배열(SoA)로 보관합니다. 같은 인덱스가 같은 포지션을 가리킵니다.
+        # `_side`는 롱이면 +1, 숏이면 -1 입니다. 포지션이 없으면 모든 배열의 길이가 0 입니다.
+        self._entry = np.empty(0, dtype=np.float64)
+        self._qty = np.empty(0, dtype=np.float64)
+        self._tp = np.empty(0, dtype=np.float64)
+        self._sl = np.empty(0, dtype=np.float64)
+        self._side = np.empty(0, dtype=np.int8)
+        # 모든 거래(진입/종료) 기록을 컬럼별 리스트로 저장합니다. 거래마다 딕셔너리를 만들지 않고
+        # 원시 값만 각 컬럼 리스트에 덧붙입니다. 진입 기록의 `pnl`은 NaN 입니다.
+        self._trades = {col: [] for col in self.TRADE_COLS}
 
         # 리스크 관리 변수
         self.loss_cnt = 0         # 연속 손실 횟수
-        self.pause_until = None   # 거래 중단이 해제되는 시간 (datetime 객체)
-
-        # 멀티스레드 환경에서 공유 데이터(self.pos, self.balance 등)를 안전하게 접근하기 위한 잠금(lock) 객체.
-        self.lock = threading.Lock()
+        self.pause_until = None   # 거래 중단이 해제되는 시간 (UTC 기준 datetime 객체, 표시용)
+        self._pause_until_mono = 0.0  # 거래 중단이 해제되는 시점 (time.monotonic 기준, 판정용)
+        self.on_resume = None     # 거래 중단을 수동으로 해제했을 때 호출할 콜백 (예: `TradingBot.wake`)
+
+        # 멀티스레드 환경에서 공유 데이터를 안전하게 접근하기 위한 잠금(lock) 객체들.
+        # - `_pos_lock`: 포지션 배열, 잔고, 거래 내역. (`_risk_lock`과 함께 잡을 때는 항상 이 잠금을 먼저 잡습니다.)
+        # - `_risk_lock`: 연속 손실 횟수와 거래 중단 상태.
+        self._pos_lock = threading.Lock()
+        self._risk_lock = threading.Lock()
+        # `pos` 속성이 반환하는 첫 번째 포지션의 읽기 전용 스냅샷. 포지션이 바뀔 때 `_pos_lock` 안에서 통째로 교체되므로,
+        # UI 등 다른 스레드는 잠금 없이 읽어도 항상 일관된 값을 봅니다.
+        self._pos_snapshot = None
 
         # 라이브 모드일 경우, 시작 시점에 레버리지와 마진 모드를 설정합니다.
         if not paper:
             self.ex.set_leverage(CFG.SYMBOL, CFG.LEVERAGE, CFG.ISOLATED)
 
-    def _pnl(self, exit_px: float) -> float:
-        """내부적으로 손익(PnL)을 계산합니다."""
-        if not self.pos: return 0.0
-        entry, qty, side = self.pos["entry"], self.pos["qty"], self.pos["side"]
+    @property
+    def trades(self) -> dict:
+        """
+        거래 내역을 컬럼별 리스트 딕셔너리로 반환합니다. `pd.DataFrame(order.trades)`로 바로 표로 만들 수 있습니다.
 
-        # 가격 변화에 따른 손익 계산
-        delta = (exit_px - entry) if side == "long" else (entry - exit_px)
+        기록은 `pnl` 컬럼에 마지막으로 덧붙여지므로, `pnl` 길이만큼 잘라 반환하면 다른 스레드가
+        기록하는 도중에 읽더라도 모든 컬럼의 길이가 같습니다.
+        """
+        n = len(self._trades["pnl"])
+        return {col: values[:n] for col, values in self._trades.items()}
+
+    def _record_trade(self, ts, side: str, price: float, pnl: float = float("nan")):
+        """거래 한 건을 컬럼별 리스트에 기록합니다. `_pos_lock` 안에서 호출해야 합니다."""
+        t = self._trades
+        t["time"].append(ts)
+        t["side"].append(side)
+        t["price"].append(price)
+        t["bal"].append(self.balance)
+        t["pnl"].append(pnl)  # 반드시 마지막에 덧붙입니다 (`trades` 참고).
+
+    @property
+    def pos(self):
+        """
+        첫 번째 포지션 정보를 `Position`으로 반환합니다. 없으면 None.
+        예: Position(entry=30000.0, qty=0.01, side="long", sign=1)
+        """
+        return self._pos_snapshot
+
+    def _refresh_snapshot(self):
+        """포지션 배열이 바뀐 뒤 `pos` 스냅샷을 다시 만듭니다. `_pos_lock` 안에서 호출해야 합니다."""
+        if self._entry.size == 0:
+            self._pos_snapshot = None
+        else:
+            sign = int(self._side[0])
+            self._pos_snapshot = Position(float(self._entry[0]), float(self._qty[0]),
+                                          "long" if sign > 0 else "short", sign)
+
+    def _add_position(self, entry_px: float, qty: float, side: str):
+        """포지션 배열 끝에 새 포지션을 추가하고, TP/SL 가격을 미리 계산해 둡니다."""
+        sign = 1 if side == "long" else -1
+        self._entry = np.append(self._entry, entry_px)
+        self._qty = np.append(self._qty, qty)
+        self._tp = np.append(self._tp, entry_px * (1 + sign * CFG.TP_PCT))
+        self._sl = np.append(self._sl, entry_px * (1 - sign * CFG.SL_PCT))
+        self._side = np.append(self._side, np.int8(sign))
+        self._refresh_snapshot()
+
+    def _drop_positions(self, idx):
+        """주어진 인덱스의 포지션들을 배열에서 제거합니다. `idx`가 None이면 모두 제거합니다."""
+        keep = np.zeros(self._entry.size, dtype=bool)
+        if idx is not None:
+            keep[:] = True
+            keep[idx] = False
+        self._entry, self._qty = self._entry[keep], self._qty[keep]
+        self._tp, self._sl, self._side = self._tp[keep], self._sl[keep], self._side[keep]
+        self._refresh_snapshot()
+
+    def _pnl(self, exit_px: float, i: int = 0) -> float:
+        """내부적으로 `i`번째 포지션의 손익(PnL)을 계산합니다."""
+        if i >= self._entry.size: return 0.0
+        entry, qty = float(self._entry[i]), float(self._qty[i])
+
+        # 가격 변화에 따른 손익 계산 (롱: +1, 숏: -1)
+        delta = (exit_px - entry) * int(self._side[i])
 
         # 수수료 및 펀딩비 계산
         fee = abs(exit_px * qty) * CFG.TRADE_FEE
@@ -72,11 +160,11 @@ class OrderService:
         # 최종 PnL = (가격 변화 * 수량 * 레버리지) - 수수료 - 펀딩비
         return delta * qty * CFG.LEVERAGE - fee - funding
 
-    def _attach_tp_sl(self, side: str, entry_px: float, qty: float):
-        """포지션 진입 후 TP/SL 주문을 거래소에 전송합니다 (라이브 모드 전용)."""
-        # 설정된 비율에 따라 TP/SL 가격을 계산합니다.
-        tp_px = entry_px * (1 + CFG.TP_PCT) if side == "long" else entry_px * (1 - CFG.TP_PCT)
-        sl_px = entry_px * (1 - CFG.SL_PCT) if side == "long" else entry_px * (1 + CFG.SL_PCT)
+    def _attach_tp_sl(self, i: int = -1):
+        """`i`번째(기본값: 마지막으로 추가된) 포지션의 TP/SL 주문을 거래소에 전송합니다 (라이브 모드 전용)."""
+        # TP/SL 가격은 `_add_position`에서 방향 부호(롱: +1, 숏: -1)로 이미 계산해 두었으므로 그대로 사용합니다.
+        tp_px, sl_px = float(self._tp[i]), float(self._sl[i])
+        qty, sign = float(self._qty[i]), int(self._side[i])
 
         if self.paper:
             logging.info(f"[PAPER] Simulating TP/SL attachment at TP={tp_px:.2f}, SL={sl_px:.2f}")
@@ -90,7 +178,7 @@ class OrderService:
             sl_px_r = self.ex.client.price_to_precision(CFG.SYMBOL, sl_px)
 
             # 종료 주문의 방향은 진입 포지션과 반대입니다.
-            exit_side = "SELL" if side == "long" else "BUY"
+            exit_side = SELL if sign > 0 else BUY
 
             # 거래소에 TP 주문과 SL 주문을 각각 전송합니다.
             self.ex.create_exit_order(CFG.SYMBOL, exit_side, qty, tp_px_r, tp=True)
@@ -102,16 +190,18 @@ class OrderService:
 
     def open_position(self, px: float, qty: float, side: str):
         """새로운 포지션을 엽니다."""
-        with self.lock:
-            if self.pos: return # 이미 포지션이 있으면 진입하지 않음
+        with self._pos_lock:
+            if self._entry.size: return # 이미 포지션이 있으면 진입하지 않음
 
+            # 방향 부호(롱: +1, 숏: -1). 이후 가격 계산은 방향별 분기 대신 이 부호를 곱해 처리합니다.
+            sign = 1 if side == "long" else -1
             # 페이퍼 모드에서는 슬리피지를 시뮬레이션하여 진입 가격을 계산합니다.
-            entry_px = px * (1 + CFG.SLIP_PCT) if side == "long" else px * (1 - CFG.SLIP_PCT)
+            entry_px = px * (1 + sign * CFG.SLIP_PCT)
 
             if not self.paper:
                 try:
                     # 라이브 모드에서는 실제 시장가 주문을 전송합니다.
-                    order = self.ex.create_market_order(CFG.SYMBOL, "buy" if side == "long" else "sell", qty)
+                    order = self.ex.create_market_order(CFG.SYMBOL, BUY if sign > 0 else SELL, qty)
                     # 실제 체결된 가격으로 진입 가격을 업데이트합니다. 체결가 정보가 없으면 시뮬레이션 가격을 사용합니다.
                     entry_px = float(order.get("price", entry_px))
                 except Exception as e:
@@ -120,67 +210,89 @@ class OrderService:
                     return
 
             # 내부 포지션 상태를 업데이트합니다.
-            self.pos = {"entry": entry_px, "qty": qty, "side": side}
+            self._add_position(entry_px, qty, side)
             # 거래 내역을 기록합니다.
-            self.trades.append({"time": datetime.utcnow(), "side": side.upper(), "price": entry_px, "bal": self.balance})
+            self._record_trade(datetime.now(timezone.utc), side.upper(), entry_px)
             tg(f"🚀 {'[PAPER]' if self.paper else '[LIVE]'} {side.upper()} position opened @ {entry_px:.2f}")
 
-            # TP/SL 주문을 부착합니다.
-            self._attach_tp_sl(side, entry_px, qty)
+            # 방금 추가한 포지션에 TP/SL 주문을 부착합니다.
+            self._attach_tp_sl()
 
     def poll_position_closed(self, px_now: float):
         """(페이퍼 모드 전용) 현재 가격을 기준으로 포지션 종료 여부를 확인합니다."""
-        with self.lock:
+        with self._pos_lock:
             # 포지션이 없거나 라이브 모드일 경우 이 메서드는 작동하지 않습니다.
-            if not self.pos or not self.paper: return
-
-            entry, side = self.pos["entry"], self.pos["side"]
-            # 현재 가격이 TP 또는 SL 가격에 도달했는지 확인합니다.
-            hit_tp = (px_now >= entry * (1 + CFG.TP_PCT)) if side == "long" else (px_now <= entry * (1 - CFG.TP_PCT))
-            hit_sl = (px_now <= entry * (1 - CFG.SL_PCT)) if side == "long" else (px_now >= entry * (1 + CFG.SL_PCT))
-
-            if not (hit_tp or hit_sl): return # TP/SL에 도달하지 않았으면 아무것도 하지 않음
-
-            # 포지션 종료 처리
-            pnl = self._pnl(px_now)
-            self.balance += pnl
-            self.trades.append({"time": datetime.utcnow(), "side": f"CLOSE_{side.upper()}", "price": px_now, "bal": self.balance, "pnl": pnl})
-            tg(f"✅ [PAPER] {side.upper()} position closed @ {px_now:.2f}. PnL={pnl:.2f}")
-
-            # 리스크 관리: 연속 손실 확인
-            self.loss_cnt = self.loss_cnt + 1 if pnl < 0 else 0
-            if self.loss_cnt >= CFG.MAX_LOSS:
-                self.pause_until = datetime.utcnow() + timedelta(hours=CFG.PAUSE_HR)
-                tg(f"⛔ Max consecutive losses reached ({self.loss_cnt}). Pausing trading for {CFG.PAUSE_HR} hour(s).")
-
-            # 내부 포지션 상태 초기화
-            self.pos = None
+            if self._entry.size == 0 or not self.paper: return
+
+            # 모든 포지션에 대해 TP/SL 도달 여부를 한 번에 계산합니다.
+            px = np.asarray(px_now, dtype=np.float64)
+            closed = np.flatnonzero(tp_sl_hit(px, self._side, self._tp, self._sl))
+            if closed.size == 0: return # TP/SL에 도달하지 않았으면 아무것도 하지 않음
+
+            # 거래 기록용 벽시계 시각과 중단 판정용 monotonic 시각은 호출당 한 번만 읽어 모든 종료 처리에 공유합니다.
+            now, now_mono = datetime.now(timezone.utc), time.monotonic()
+            # 종료된 포지션만 순회하며 종료 처리
+            for i in closed:
+                px_i = float(px if px.ndim == 0 else px[i])
+                side = "long" if self._side[i] > 0 else "short"
+                pnl = self._pnl(px_i, i)
+                self.balance += pnl
+                self._record_trade(now, f"CLOSE_{side.upper()}", px_i, pnl)
+                tg(f"✅ [PAPER] {side.upper()} position closed @ {px_i:.2f}. PnL={pnl:.2f}")
+
+                # 리스크 관리: 연속 손실 확인
+                with self._risk_lock:
+                    self.loss_cnt = self.loss_cnt + 1 if pnl < 0 else 0
+                    if self.loss_cnt >= CFG.MAX_LOSS:
+                        self._pause_until_mono = now_mono + CFG.PAUSE_HR * 3600
+                        self.pause_until = now + timedelta(hours=CFG.PAUSE_HR)
+                        tg(f"⛔ Max consecutive losses reached ({self.loss_cnt}). Pausing trading for {CFG.PAUSE_HR} hour(s).")
+
+            # 종료된 포지션을 내부 상태에서 제거
+            self._drop_positions(closed)
 
     def is_paused(self) -> bool:
         """거래가 연속 손실로 인해 일시 중단 상태인지 확인합니다."""
-        with self.lock:
-            # `pause_until`이 설정되어 있고, 아직 현재 시간이 그 이전이라면 True를 반환.
-            if self.pause_until and datetime.utcnow() < self.pause_until:
-                return True
-            # `pause_until` 시간이 지났다면, 중단 상태를 해제하고 관련 변수를 초기화.
-            if self.pause_until and datetime.utcnow() >= self.pause_until:
+        # 매 루프마다 호출되므로 datetime 객체를 만들지 않고 monotonic 시계의 실수 비교만 수행합니다.
+        if time.monotonic() < self._pause_until_mono:
+            return True
+        # 포지션 잠금은 잡지 않으므로, 다른 스레드의 포지션 처리(`sync_position` 등)를 기다리지 않습니다.
+        with self._risk_lock:
+            # 중단 시간이 지났다면, 중단 상태를 해제하고 관련 변수를 초기화.
+            if self.pause_until is not None:
                 self.pause_until = None
                 self.loss_cnt = 0
                 tg("▶️ Trading has been resumed.")
             return False
 
+    def pause_remaining(self) -> float:
+        """거래 일시 중단이 해제되기까지 남은 시간(초)을 반환합니다. 중단 상태가 아니면 0."""
+        return max(0.0, self._pause_until_mono - time.monotonic())
+
+    def resume(self):
+        """
+        연속 손실로 인한 거래 일시 중단을 즉시 해제합니다.
+
+        중단 해제를 기다리며 잠들어 있는 메인 루프가 바로 깨어나도록 `on_resume` 콜백을 호출합니다.
+        """
+        self._pause_until_mono = 0.0
+        self.is_paused()
+        if self.on_resume is not None:
+            self.on_resume()
+
     def sync_position(self):
         """(라이브 모드 전용) 실제 거래소의 포지션과 내부 상태를 동기화합니다."""
-        with self.lock:
-            # 페이퍼 모드이거나 내부적으로 포지션이 없다고 기록된 경우, 동기화가 불필요.
-            if self.paper or not self.pos: return
+        # 페이퍼 모드이거나 내부적으로 포지션이 없다고 기록된 경우, 동기화가 불필요.
+        if self.paper or self._entry.size == 0: return
 
-            # 거래소에서 실제 포지션 정보를 가져옵니다.
-            pos_ex = self.ex.fetch_position(CFG.SYMBOL)
+        # 거래소에서 실제 포지션 정보를 가져옵니다. 네트워크 호출 동안 잠금을 잡고 있지 않도록 잠금 밖에서 조회합니다.
+        pos_ex = self.ex.fetch_position(CFG.SYMBOL)
 
+        with self._pos_lock:
             # 거래소에 해당 심볼의 포지션이 없는데, 내부적으로는 포지션이 있다고 기록된 경우
             # (예: TP/SL이 체결되었거나, 수동으로 포지션을 닫은 경우)
-            if not pos_ex:
+            # 조회하는 동안 다른 곳에서 이미 포지션을 정리했다면 아무것도 하지 않습니다.
+            if not pos_ex and self._entry.size:
                 tg("ℹ️ Position sync: No position found on exchange. Resetting internal state.")
                 # 내부 포지션 상태를 초기화합니다.
-                self.pos = None
+                self._drop_positions(None)
@@ -4,6 +4,8 @@
 이 모듈은 최종적인 매매 신호(Long, Short, Exit)를 생성하는 로직을 포함합니다.
 `Strategy` 클래스는 상태를 갖지 않는 정적(static) 메서드만을 포함하므로,
 인스턴스를 생성할 필요 없이 `Strategy.enrich(df)`와 같이 직접 호출하여 사용합니다.
+메인 루프는 데이터프레임 대신 컬럼별 numpy 배열을 다루며, 시작 시 `Strategy.compile()`로 임계값을 고정한
+`enrich_soa` 함수를 만들어 사용합니다.
 
 전략의 핵심 아이디어:
 1.  **규칙 기반 필터**: 기술적 지표(EMA, RSI, MACD)를 사용하여 1차적으로 유망한 진입 시점을 포착합니다.
@@ -16,84 +18,110 @@
 3.  **청산 신호**: 포지션 보유 중, 특정 조건이 발생하면 청산 신호를 생성합니다. 청산 신호는 여러 조건의
     논리합(OR)으로 구성되어, 하나라도 만족하면 발동됩니다.
 """
+import numpy as np
 from config.config import CFG
+from src.bot._fast import enrich_kernel
 
 class Strategy:
     """
     데이터프레임에 진입/청산 신호 컬럼을 추가하는 정적 클래스.
     """
 
+    # 신호 계산에 필요한 입력 컬럼과, 계산 결과로 추가되는 신호 컬럼.
+    INPUTS = ("ema_fast", "ema_slow", "rsi", "macd", "macd_sig", "prob_up")
+    OUTPUTS = ("rule_long", "rule_short", "long", "short", "exit_l", "exit_s")
+
     @staticmethod
     def enrich(df):
         """
         주어진 데이터프레임에 매매 신호 컬럼들(`long`, `short`, `exit_l`, `exit_s`)을 추가합니다.
 
+        신호 계산 자체는 모듈 로드 시 `Strategy.compile()`로 임계값을 고정해 둔 `enrich_soa` 함수가
+        numpy 배열 위에서 수행하며, 이 메서드는 그 결과를 컬럼으로 붙입니다.
+
         Args:
             df (pd.DataFrame): `ModelService`에서 `prob_up` 컬럼까지 추가된 데이터프레임.
 
         Returns:
             pd.DataFrame: 매매 신호 컬럼들이 추가된 데이터프레임.
         """
-        # 원본 수정을 방지하기 위해 데이터프레임 복사
-        df = df.copy()
-
-        # --- 1. 규칙 기반 롱/숏 진입 조건 생성 ---
-
-        # `rule_long`: 롱 포지션 진입을 위한 1차 규칙 필터
-        df["rule_long"] = (
-            (df["ema_fast"] > df["ema_slow"]) &  # 단기 EMA > 장기 EMA (상승 추세)
-            (df["rsi"] < 40) &                  # RSI가 40 미만 (과매도 구간 근접, 반등 기대)
-            (df["macd"] > df["macd_sig"])       # MACD선 > 시그널선 (상승 모멘텀)
-        )
-
-        # `rule_short`: 숏 포지션 진입을 위한 1차 규칙 필터
-        df["rule_short"] = (
-            (df["ema_fast"] < df["ema_slow"]) &  # 단기 EMA < 장기 EMA (하락 추세)
-            (df["rsi"] > 60) &                  # RSI가 60 초과 (과매수 구간 근접, 조정 기대)
-            (df["macd"] < df["macd_sig"])       # MACD선 < 시그널선 (하락 모멘텀)
-        )
-
-        # --- 2. ML 모델 예측을 결합한 최종 진입 신호 생성 ---
-
-        # `long`: 최종 롱 포지션 진입 신호
-        # `rule_long` 조건을 만족하고, 동시에 모델이 예측한 상승 확률이 `BUY_TH` 임계값보다 높아야 함.
-        df["long"] = df["rule_long"] & (df["prob_up"] > CFG.BUY_TH)
-
-        # `short`: 최종 숏 포지션 진입 신호
-        # `rule_short` 조건을 만족하고, 동시에 모델이 예측한 상승 확률이 `SHORT_TH` 임계값보다 낮아야 함.
-        df["short"] = df["rule_short"] & (df["prob_up"] < CFG.SHORT_TH)
-
-        # --- 3. 포지션 청산 신호 생성 ---
-
-        # `exit_l`: 롱 포지션 청산 신호 (여러 조건 중 하나만 만족해도 True)
-        df["exit_l"] = (
-            (df["prob_up"] < CFG.SELL_TH) |     # 모델 예측 상승 확률이 `SELL_TH` 임계값 미만으로 하락
-            (df["rsi"] > 70) |                  # RSI가 70 초과 (과매수 상태 진입)
-            (df["macd"] < df["macd_sig"])       # MACD선이 시그널선 아래로 하향 돌파 (상승 모멘텀 약화)
-        )
-
-        # `exit_s`: 숏 포지션 청산 신호 (여러 조건 중 하나만 만족해도 True)
-        df["exit_s"] = (
-            (df["prob_up"] > CFG.BUY_TH) |      # 모델 예측 상승 확률이 `BUY_TH` 임계값 초과로 상승
-            (df["rsi"] < 30) |                  # RSI가 30 미만 (과매도 상태 진입)
-            (df["macd"] > df["macd_sig"])       # MACD선이 시그널선 위로 상향 돌파 (하락 모멘텀 약화)
-        )
-
-        # NOTE: 잠재적 전략 개선점에 대한 설명
-        # 현재 구조에서는 일부 진입/청산 조건이 서로 상충되거나 중복될 수 있습니다.
-        # 예를 들어, 롱 포지션 진입 조건 중 하나인 `(df["macd"] > df["macd_sig"])`는
-        # 숏 포지션 청산 조건(`exit_s`)에도 포함됩니다.
-        # 반대로, 롱 포지션 청산 조건 중 하나인 `(df["macd"] < df["macd_sig"])`는
-        # 숏 포지션 진입 조건(`rule_short`)에 포함됩니다.
-        #
-        # 이러한 중복은 다음과 같은 문제를 야기할 수 있습니다:
-        # - Whipsaw (톱니 현상): 횡보장에서 작은 가격 변동에도 진입과 청산이 매우 짧은 시간 안에 반복되어
-        #   거래 비용만 누적시킬 수 있습니다. 예를 들어, MACD가 시그널선을 살짝 넘어서 롱에 진입했다가,
-        #   바로 다음 캔들에서 살짝 아래로 내려와서 청산되는 상황이 발생할 수 있습니다.
+        # 기존 컬럼은 그대로 두고 신호 컬럼만 추가하므로, 복사본에 한 컬럼씩 대입하지 않고
+        # `assign`으로 신호 컬럼 6개를 한 번에 붙인 새 데이터프레임을 반환합니다. 원본은 바뀌지 않습니다.
+        arrays = _enrich_soa({col: df[col].to_numpy() for col in Strategy.INPUTS})
+        return df.assign(**{col: arrays[col] for col in Strategy.OUTPUTS})
+
+    @staticmethod
+    def compile(cfg=CFG):
+        """
+        임계값을 미리 묶어 둔 `enrich_soa` 함수를 만듭니다.
+
+        `CFG.BUY_TH`, `CFG.SELL_TH`, `CFG.SHORT_TH`는 실행 중 바뀌지 않으므로, 시작 시 한 번만 읽어
+        클로저의 지역 변수로 고정해 두면 매 틱마다 설정 객체의 속성을 조회할 필요가 없습니다.
+
+        Args:
+            cfg (optional): 임계값을 읽을 설정 객체. Defaults to CFG.
+
+        Returns:
+            Callable: `enrich_soa(a, start=0)`와 같은 시그니처와 결과를 갖는 함수.
+        """
+        buy_th, sell_th, short_th = float(cfg.BUY_TH), float(cfg.SELL_TH), float(cfg.SHORT_TH)
+        inputs, outputs, kernel, empty = Strategy.INPUTS, Strategy.OUTPUTS, enrich_kernel, np.empty
+
+        def enrich_soa(a, start: int = 0):
+            n = len(a["rsi"]) - start
+            out = {col: empty(n, dtype=bool) for col in outputs}
+            kernel(*(a[col][start:] for col in inputs), *out.values(), buy_th, sell_th, short_th)
+            a.update(out)
+            return a
+
+        enrich_soa.__doc__ = Strategy.enrich_soa.__doc__
+        return enrich_soa
+
+    @staticmethod
+    def enrich_soa(a, start: int = 0):
+        """
+        컬럼별 numpy 배열 딕셔너리에 매매 신호 배열들을 추가합니다. 데이터프레임을 만들지 않습니다.
+
+        라이브 루프에서는 이미 신호를 계산해 둔 과거 행을 다시 계산할 필요가 없으므로, `start`를 지정하면
+        `start`번째 행부터의 꼬리 구간에 대해서만 신호를 계산합니다. 보통은 마지막 한 행(진행 중인 봉)입니다.
+
+        Args:
+            a (dict[str, np.ndarray]): `IndicatorRepository.get_merged_soa`의 배열에 `prob_up`이 추가된 딕셔너리.
+            start (int, optional): 신호를 계산할 첫 행의 위치. Defaults to 0 (전체 행).
+
+        Returns:
+            dict[str, np.ndarray]: 같은 딕셔너리. `rule_long`, `rule_short`, `long`, `short`,
+            `exit_l`, `exit_s` bool 배열이 추가됩니다. 신호 배열의 길이는 `len(a["rsi"]) - start`이며,
+            마지막 원소가 항상 가장 최신 행의 신호입니다.
+        """
+        # 규칙 기반 필터(`rule_long`, `rule_short`)와 ML 확률을 결합한 진입 신호(`long`, `short`),
+        # 청산 신호(`exit_l`, `exit_s`)를 하나의 커널에서 미리 할당한 배열에 한 번에 계산합니다.
+        # - rule_long  = (ema_fast > ema_slow) & (rsi < 40) & (macd > macd_sig)
+        # - rule_short = (ema_fast < ema_slow) & (rsi > 60) & (macd < macd_sig)
+        # - long  = rule_long & (prob_up > BUY_TH),  short = rule_short & (prob_up < SHORT_TH)
+        # - exit_l = (prob_up < SELL_TH) | (rsi > 70)
+        # - exit_s = (prob_up > BUY_TH)  | (rsi < 30)
+        n = len(a["rsi"]) - start
+        out = {col: np.empty(n, dtype=bool) for col in Strategy.OUTPUTS}
+        enrich_kernel(*(a[col][start:] for col in Strategy.INPUTS),
+                      *out.values(), CFG.BUY_TH, CFG.SELL_TH, CFG.SHORT_TH)
+        a.update(out)
+
+        # NOTE: 청산 조건에서 MACD 교차 항을 뺀 이유
+        # 이전에는 `exit_l`에 `(macd < macd_sig)`, `exit_s`에 `(macd > macd_sig)`가 포함되어 있었습니다.
+        # 이 조건은 반대 방향 진입 규칙(`rule_short`, `rule_long`)의 일부이기도 해서, 횡보장에서 MACD가
+        # 시그널선을 살짝 넘어 롱에 진입했다가 바로 다음 캔들에서 살짝 내려와 청산되는
+        # Whipsaw(톱니 현상)를 만들고 거래 비용만 누적시켰습니다.
+        # 현재 청산은 ML 확률의 반전과 RSI 극단값만으로 판단합니다.
         #
-        # 개선 방안:
+        # 추가 개선 방안:
         # - 진입 조건과 청산 조건의 민감도를 다르게 설정 (예: 진입은 더 엄격하게, 청산은 더 관대하게).
         # - 진입/청산 로직에 시간 지연(time delay)이나 연속적인 신호 확인(confirmation)과 같은 필터를 추가.
         # - 상태 머신(State Machine)을 도입하여 '진입 탐색', '포지션 보유', '청산 탐색' 등 상태에 따라
         #   다른 규칙을 적용하는 것을 고려해볼 수 있습니다.
-        return df
+        return a
+
+
+# `Strategy.enrich`가 사용하는, `CFG` 임계값을 지역 변수로 묶어 둔 신호 계산 함수.
+# 호출마다 `CFG.BUY_TH` 등의 속성을 조회하지 않도록 모듈 로드 시 한 번만 만듭니다.
+_enrich_soa = Strategy.compile(CFG)
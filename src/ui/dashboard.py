@@ -9,6 +9,7 @@ Streamlit을 사용한 실시간 트레이딩 대시보드.
   최신 정보를 표시합니다.
 - **사이드바 정보**: 현재 트레이딩 모드(Paper/Live), 잔고, 레버리지, 모델 학습 시간,
   현재 포지션 상태 등 핵심 정보를 한눈에 볼 수 있도록 사이드바에 표시합니다.
+  연속 손실로 거래가 일시 중단되면 남은 시간과 함께 즉시 재개할 수 있는 버튼을 보여줍니다.
 - **데이터 시각화**: `plotly` 라이브러리를 사용하여 다음과 같은 차트를 생성합니다.
   - 15분봉 캔들스틱 차트 (EMA 포함)
   - RSI 및 MACD 지표 차트
@@ -23,11 +24,97 @@ import pandas as pd
 from streamlit_autorefresh import st_autorefresh
 from config.config import CFG
 
+# 최근 신호 테이블에 표시할 컬럼.
+_SIG_COLS = ["close", "prob_up", "long", "short", "exit_l", "exit_s"]
+
+# 차트 하나에 그릴 최대 점 개수. 화면 폭보다 훨씬 많은 점은 브라우저로 보내도 구분되지 않습니다.
+CHART_POINTS = 800
+
+def _stride(n: int, target: int = CHART_POINTS) -> slice:
+    """
+    길이 `n`인 시퀀스에서 최대 `target`개를 일정 간격으로 고르는 슬라이스를 반환합니다.
+    마지막 원소에서부터 거꾸로 간격을 잡으므로, 가장 최신 값은 항상 포함됩니다.
+    """
+    if n <= target:
+        return slice(None)
+    step = -(-n // target)  # 올림 나눗셈
+    return slice((n - 1) % step, None, step)
+
+def _downsample(df: pd.DataFrame, target: int = CHART_POINTS) -> pd.DataFrame:
+    """
+    행 수가 `target`보다 많으면 일정 간격으로 행을 골라 줄입니다. 가장 최신 행은 항상 포함됩니다.
+
+    같은 위치의 행을 고르므로, 한 데이터프레임에서 만든 캔들과 보조 지표 선은 서로 어긋나지 않습니다.
+    """
+    return df.iloc[_stride(len(df), target)]
+
+def _new_figures():
+    """
+    캔들/지표 차트의 빈 Figure를 만듭니다. 트레이스 구성은 항상 같으므로 세션마다 한 번만 만듭니다.
+
+    Returns:
+        tuple: (캔들스틱 + EMA 차트, RSI/MACD 차트)
+    """
+    # 1. 15분봉 캔들스틱 차트
+    fig = go.Figure(data=[
+        go.Candlestick(name="Candles"),
+        go.Scatter(name="EMA Fast", line=dict(color="blue", width=1)),
+        go.Scatter(name="EMA Slow", line=dict(color="red", width=1))
+    ])
+    fig.update_layout(xaxis_rangeslider_visible=False) # 차트 아래의 작은 범위 슬라이더를 숨깁니다.
+
+    # 2. RSI & MACD 지표 차트
+    fig2 = go.Figure(data=[
+        go.Scatter(name="RSI", line=dict(color="purple")),
+        go.Scatter(name="MACD", line=dict(color="green")),
+        go.Scatter(name="MACD Signal", line=dict(color="orange")),
+    ])
+    fig2.update_layout(xaxis_rangeslider_visible=False)
+    return fig, fig2
+
+def _charts(snap_id: int, df: pd.DataFrame):
+    """
+    캔들/지표 차트와 최근 신호 테이블을 반환합니다.
+
+    Streamlit은 새로고침/상호작용마다 스크립트 전체를 다시 실행하지만, 봇의 데이터는 새 스냅샷이
+    게시될 때만 바뀝니다. Figure는 세션 상태(`st.session_state`)에 한 번만 만들어 두고, 스냅샷 번호가
+    바뀐 경우에만 기존 트레이스의 데이터 배열을 교체합니다. 트레이스 정의를 매번 다시 만들고 검증하지 않습니다.
+
+    Args:
+        snap_id (int): `TradingBot.snapshot_df`가 반환한 스냅샷 번호.
+        df (pd.DataFrame): 해당 스냅샷의 데이터프레임.
+
+    Returns:
+        tuple: (캔들스틱 차트, RSI/MACD 차트, 최근 5개 신호 데이터프레임)
+    """
+    ss = st.session_state
+    if "fig_candle" not in ss:
+        ss.fig_candle, ss.fig_ind = _new_figures()
+        ss.chart_snap = None
+    if ss.chart_snap != snap_id:
+        # 차트에는 줄인 데이터를, 신호 테이블에는 원본의 마지막 행들을 사용합니다.
+        d = _downsample(df)
+        x = d.index
+        candle, ema_fast, ema_slow = ss.fig_candle.data
+        candle.update(x=x, open=d["open"].to_numpy(), high=d["high"].to_numpy(),
+                      low=d["low"].to_numpy(), close=d["close"].to_numpy())
+        ema_fast.update(x=x, y=d["ema_fast"].to_numpy())
+        ema_slow.update(x=x, y=d["ema_slow"].to_numpy())
+        for trace, col in zip(ss.fig_ind.data, ("rsi", "macd", "macd_sig")):
+            trace.update(x=x, y=d[col].to_numpy())
+
+        # 3. 표시할 컬럼만 선택한 마지막 5개 행
+        # 행을 먼저 위치로 자른 뒤 컬럼을 고르므로, 전체 행에 대한 컬럼 선택이 일어나지 않습니다.
+        # 세션 상태에 다음 실행까지 보관되므로, 봇이 재사용하는 스냅샷 버퍼를 가리키지 않도록 5행만 복사해 둡니다.
+        ss.signals = df.iloc[-5:].loc[:, _SIG_COLS].copy()
+        ss.chart_snap = snap_id
+    return ss.fig_candle, ss.fig_ind, ss.signals
+
 def run_dashboard(bot):
     """
     Streamlit 대시보드를 생성하고 실행하는 메인 함수.
 
-    이 함수는 `TradingBot` 인스턴스를 인자로 받아, 봇의 내부 상태(`bot.order`, `bot.model`, `bot.get_df()`)를
+    이 함수는 `TradingBot` 인스턴스를 인자로 받아, 봇의 내부 상태(`bot.order`, `bot.model`, `bot.snapshot_df()`)를
     주기적으로 읽어와 UI 컴포넌트를 렌더링합니다.
 
     Args:
@@ -53,53 +140,54 @@ def run_dashboard(bot):
     # 현재 포지션 상태를 표시합니다.
     if bot.order.pos:
         pos_info = bot.order.pos
-        st.sidebar.success(f"POSITION: {pos_info['side'].upper()} @ {pos_info['entry']:.1f}")
+        st.sidebar.success(f"POSITION: {pos_info.side.upper()} @ {pos_info.entry:.1f}")
     else:
         st.sidebar.warning("No open position.")
 
+    # 연속 손실로 거래가 일시 중단된 경우, 남은 시간과 함께 즉시 재개할 수 있는 버튼을 표시합니다.
+    remaining = bot.order.pause_remaining()
+    if remaining > 0:
+        st.sidebar.error(f"TRADING PAUSED: {remaining / 60:.0f} min left")
+        if st.sidebar.button("Resume trading now"):
+            # 중단을 해제하면 `OrderService.on_resume`(= `TradingBot.wake`)이 대기 중인 메인 루프를 바로 깨웁니다.
+            bot.order.resume()
+            st.rerun()
+
     # --- 메인 컨텐츠 ---
 
-    # 봇으로부터 최신 데이터프레임을 스레드 안전하게 가져옵니다.
-    df = bot.get_df()
-
-    # 데이터프레임이 유효한 경우에만 차트와 테이블을 그립니다.
-    if df is not None and not df.empty:
-        # 1. 15분봉 캔들스틱 차트
-        st.subheader("15-minute Candlestick Chart")
-        fig = go.Figure(data=[
-            go.Candlestick(x=df.index, open=df["open"], high=df["high"], low=df["low"], close=df["close"], name="Candles"),
-            go.Scatter(x=df.index, y=df["ema_fast"], name="EMA Fast", line=dict(color="blue", width=1)),
-            go.Scatter(x=df.index, y=df["ema_slow"], name="EMA Slow", line=dict(color="red", width=1))
-        ])
-        fig.update_layout(xaxis_rangeslider_visible=False) # 차트 아래의 작은 범위 슬라이더를 숨깁니다.
-        st.plotly_chart(fig, use_container_width=True)
-
-        # 2. RSI & MACD 지표 차트
-        st.subheader("RSI & MACD Indicators")
-        fig2 = go.Figure(data=[
-            go.Scatter(x=df.index, y=df["rsi"], name="RSI", line=dict(color="purple")),
-            go.Scatter(x=df.index, y=df["macd"], name="MACD", line=dict(color="green")),
-            go.Scatter(x=df.index, y=df["macd_sig"], name="MACD Signal", line=dict(color="orange")),
-        ])
-        fig2.update_layout(xaxis_rangeslider_visible=False)
-        st.plotly_chart(fig2, use_container_width=True)
+    # 봇으로부터 최신 스냅샷 번호와 데이터프레임을 가져옵니다. 데이터는 복사되지 않습니다.
+    # 스냅샷 버퍼는 `with` 블록 동안 이 세션을 위해 고정되므로, 다른 탭이 새 스냅샷을 가져가도 덮어쓰이지 않습니다.
+    with bot.snapshot_df() as (snap_id, df):
+        # 데이터프레임이 유효한 경우에만 차트와 테이블을 그립니다.
+        if df is not None and not df.empty:
+            # 같은 스냅샷이면 세션에 보관된 차트/테이블을 그대로 재사용합니다.
+            fig, fig2, signals = _charts(snap_id, df)
+
+            # 1. 15분봉 캔들스틱 차트
+            st.subheader("15-minute Candlestick Chart")
+            st.plotly_chart(fig, use_container_width=True)
+
+            # 2. RSI & MACD 지표 차트
+            st.subheader("RSI & MACD Indicators")
+            st.plotly_chart(fig2, use_container_width=True)
 
-        # 3. 최근 신호 데이터 테이블
-        st.subheader("Latest Signals (tail 5)")
-        # 표시할 컬럼만 선택하여 마지막 5개 행을 데이터프레임으로 보여줍니다.
-        st.dataframe(df[["close", "prob_up", "long", "short", "exit_l", "exit_s"]].tail(5))
+            # 3. 최근 신호 데이터 테이블
+            st.subheader("Latest Signals (tail 5)")
+            st.dataframe(signals)
 
     # 거래 내역이 있는 경우에만 관련 정보를 표시합니다.
-    if bot.order.trades:
+    trades = bot.order.trades
+    if trades["time"]:
         # 4. 거래 내역 테이블
-        hist = pd.DataFrame(bot.order.trades)
+        # 거래 내역은 컬럼별 리스트이므로, 전체를 데이터프레임으로 만들지 않고 최근 20개만 잘라 표로 만듭니다.
         st.subheader("Trade History")
-        # 최근 20개의 거래 내역을 보여줍니다.
-        st.dataframe(hist.tail(20))
+        st.dataframe(pd.DataFrame({col: values[-20:] for col, values in trades.items()}))
 
         # 5. 잔고 곡선 차트
+        # 시각/잔고 리스트를 그대로 사용하며, 점이 많으면 같은 간격으로 골라 줄입니다.
         st.subheader("Balance Curve")
+        sl = _stride(len(trades["time"]))
         fig3 = go.Figure(data=[
-            go.Scatter(x=hist["time"], y=hist["bal"], mode="lines+markers", name="Balance")
+            go.Scatter(x=trades["time"][sl], y=trades["bal"][sl], mode="lines+markers", name="Balance")
         ])
         st.plotly_chart(fig3, use_container_width=True)
@@ -2,43 +2,111 @@
 공통 헬퍼(Helper) 모듈.
 
 이 모듈은 애플리케이션의 여러 부분에서 공통적으로 사용되는 유틸리티 함수들을 모아놓은 곳입니다.
-- 로깅(Logging) 설정: 파일 및 콘솔에 로그를 남기도록 표준 로깅 모듈을 설정합니다.
+- 로깅(Logging) 설정: 파일 및 콘솔에 로그를 남기도록 표준 로깅 모듈을 설정합니다 (`setup_logging`).
 - 텔레그램(Telegram) 알림: 간단한 함수 호출로 텔레그램 메시지를 보냅니다.
-- 기술적 지표(Technical Indicators) 계산: `pandas-ta` 라이브러리를 사용하여 OHLCV 데이터에 다양한 기술적 지표를 추가합니다.
+- 기술적 지표(Technical Indicators) 계산: `ta` 라이브러리와 같은 정의의 기술적 지표를 numpy/pandas로 직접 계산하여 OHLCV 데이터에 추가합니다.
+  `IndicatorEngine`은 같은 지표를 새로 들어온 봉에 대해서만 이어서 계산합니다.
 
 다른 모듈에서는 `from src.utils.helpers import tg, add_indicators`와 같이 필요한 함수를 직접 임포트하여 사용합니다.
-로깅 설정은 이 모듈이 임포트되는 시점에 자동으로 적용됩니다.
+로깅 설정은 임포트 시점이 아니라, 진입점(`main.py` 등)에서 `setup_logging()`을 호출할 때 한 번 적용됩니다.
 """
-import logging
+import os
 import sys
+import queue
+import atexit
+import logging
 from logging import StreamHandler
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import numpy as np
 import pandas as pd
-import ta
-from telegram.ext import Updater
 from config.config import CFG
 
-# --- 로깅(Logging) 설정 ---
-# 애플리케이션 전역에서 사용할 로거(Logger)를 설정합니다.
-# 이 코드는 모듈이 처음 임포트될 때 한 번만 실행되며, 이후 모든 `logging` 호출에 적용됩니다.
+log = logging.getLogger(__name__)
 
+# --- 로깅(Logging) 설정 ---
 # 로그 메시지 형식 지정: "시간 [로그레벨] 메시지" 형태로 출력됩니다.
 # 예: "2023-10-27 10:30:00,123 [INFO] 봇 시작"
 log_fmt = "%(asctime)s [%(levelname)s] %(message)s"
 
-# `logging.basicConfig`를 사용하여 루트 로거의 기본 설정을 구성합니다.
-logging.basicConfig(
-    level=logging.INFO,  # INFO 레벨 이상의 로그만 처리합니다 (DEBUG, INFO, WARNING, ERROR, CRITICAL).
-    format=log_fmt,      # 위에서 정의한 로그 메시지 형식을 사용합니다.
-    handlers=[
-        # RotatingFileHandler: 로그 파일을 관리합니다.
-        # 파일 크기가 `maxBytes`에 도달하면 새 파일에 로깅을 시작하고,
-        # 오래된 로그 파일은 `backupCount` 개수만큼 유지합니다 (예: bot.log, bot.log.1, bot.log.2).
-        RotatingFileHandler("bot_futures.log", maxBytes=5_000_000, backupCount=3), # 5MB
-        # StreamHandler: 로그 메시지를 콘솔(stdout)에도 함께 출력합니다.
-        StreamHandler(sys.stdout)
-    ]
-)
+# 로깅을 설정한 프로세스의 PID와, 그때 시작한 백그라운드 리스너.
+_log_pid = None
+_log_listener = None
+# 부모 프로세스의 파일/콘솔 핸들러와, 자식 프로세스의 로그를 받아 같은 핸들러로 넘기는 큐.
+_log_handlers = ()
+_worker_log_queue = None
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    애플리케이션 전역에서 사용할 루트 로거를 설정합니다. 프로세스마다 한 번만 적용되며, 다시 호출해도 무시됩니다.
+
+    로그를 남기는 스레드(메인 루프 등)는 `QueueHandler`로 메모리 큐에 레코드를 넣기만 하고,
+    실제 파일/콘솔 출력은 `QueueListener`의 백그라운드 스레드가 담당합니다. 따라서 `logging.info` 호출이
+    파일 쓰기나 로그 파일 교체(rotation)를 기다리지 않습니다.
+    - RotatingFileHandler: 파일 크기가 `maxBytes`에 도달하면 새 파일에 로깅을 시작하고,
+      오래된 로그 파일은 `backupCount` 개수만큼 유지합니다 (예: bot.log, bot.log.1, bot.log.2).
+    - StreamHandler: 로그 메시지를 콘솔(stdout)에도 함께 출력합니다.
+
+    Args:
+        level (int, optional): 처리할 최소 로그 레벨. Defaults to logging.INFO.
+    """
+    global _log_pid, _log_listener, _log_handlers
+    # 포크된 자식 프로세스는 부모의 설정을 물려받지만 리스너 스레드는 물려받지 못하므로,
+    # 프로세스 ID가 다르면 다시 설정합니다. (백그라운드 학습 프로세스는 `setup_worker_logging`을 사용합니다.)
+    if _log_pid == os.getpid():
+        return
+    fmt = logging.Formatter(log_fmt)
+    handlers = [RotatingFileHandler("bot_futures.log", maxBytes=5_000_000, backupCount=3),  # 5MB
+                StreamHandler(sys.stdout)]
+    for h in handlers:
+        h.setFormatter(fmt)
+
+    q = queue.SimpleQueue()
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+    root.addHandler(QueueHandler(q))
+    root.setLevel(level)
+
+    _log_listener = QueueListener(q, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    # 종료 시 큐에 남은 로그를 모두 기록하고 리스너를 멈춥니다.
+    atexit.register(_log_listener.stop)
+    _log_handlers = tuple(handlers)
+    _log_pid = os.getpid()
+
+
+def worker_log_queue():
+    """
+    자식 프로세스가 로그 레코드를 보낼 프로세스 간 큐를 반환합니다. 처음 호출할 때 한 번만 만듭니다.
+
+    이 큐에 들어온 레코드는 부모 프로세스의 별도 리스너 스레드가 `setup_logging`의 파일/콘솔 핸들러로 넘깁니다.
+    따라서 로그 파일을 쓰고 교체(rotation)하는 프로세스는 항상 부모 하나뿐입니다.
+    `setup_logging`을 먼저 호출해야 합니다.
+    """
+    global _worker_log_queue
+    if _worker_log_queue is None:
+        import multiprocessing
+        _worker_log_queue = multiprocessing.get_context("spawn").Queue()
+        listener = QueueListener(_worker_log_queue, *_log_handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+    return _worker_log_queue
+
+
+def setup_worker_logging(q, level: int = logging.INFO) -> None:
+    """
+    자식 프로세스의 루트 로거가 모든 레코드를 `q`(`worker_log_queue`)로 보내도록 설정합니다.
+
+    `ProcessPoolExecutor`의 `initializer`로 사용합니다. 자식은 파일 핸들러를 직접 열지 않습니다.
+    """
+    global _log_pid
+    root = logging.getLogger()
+    for h in root.handlers[:]:
+        root.removeHandler(h)
+    root.addHandler(QueueHandler(q))
+    root.setLevel(level)
+    _log_pid = os.getpid()
 
 
 # --- 텔레그램(Telegram) 헬퍼 ---
@@ -49,34 +117,70 @@ def tg(msg: str) -> None:
     `config.py`에 설정된 `TG_TOKEN`과 `TG_CHAT` 정보를 사용하여 지정된 텔레그램 채팅으로 메시지를 보냅니다.
     네트워크 오류 등 예외가 발생하더라도 프로그램이 중단되지 않도록 처리하고, 대신 에러 로그를 남깁니다.
     현재 코드에서는 실제 전송 라인이 주석 처리되어 있어, 실제 메시지 발송 대신 INFO 레벨의 로그를 남깁니다.
-    실제 사용 시에는 주석을 해제해야 합니다.
+    실제 사용 시에는 주석을 해제해야 합니다. `python-telegram-bot`은 임포트 비용이 크므로,
+    모듈 로드 시점이 아니라 전송 라인 바로 앞에서 불러오도록 되어 있습니다.
 
     Args:
         msg (str): 전송할 메시지 내용.
     """
     try:
-        # 아래 라인의 주석을 해제하면 실제 텔레그램 메시지가 발송됩니다.
+        # 아래 두 라인의 주석을 해제하면 실제 텔레그램 메시지가 발송됩니다.
+        # from telegram.ext import Updater
         # Updater(CFG.TG_TOKEN).bot.send_message(chat_id=CFG.TG_CHAT, text=msg)
 
         # 현재는 비활성화 상태이며, 로그로만 메시지 내용을 출력합니다.
-        logging.info(f"Telegram (disabled) ▶ {msg}")
+        log.info(f"Telegram (disabled) ▶ {msg}")
     except Exception as e:
         # 텔레그램 메시지 전송 중 오류 발생 시, 에러 로그를 기록합니다.
-        logging.error(f"Telegram 오류: {e}")
+        log.error(f"Telegram 오류: {e}")
 
 
 # --- 기술적 지표 계산 ---
+def _ewm_mean(x: np.ndarray, **kw) -> np.ndarray:
+    """numpy 배열에 대해 pandas의 지수가중 이동평균(ewm, Cython 구현)을 적용합니다. `adjust=False` 고정."""
+    return pd.Series(x, copy=False).ewm(adjust=False, **kw).mean().to_numpy()
+
+
+def _ema(x: np.ndarray, window: int) -> np.ndarray:
+    """`ta.trend.EMAIndicator`와 같은 EMA. 처음 `window - 1`개 값은 NaN입니다."""
+    return _ewm_mean(x, span=window, min_periods=window)
+
+
+def _wilder(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    `ta.volatility.AverageTrueRange`와 같은 Wilder 평활.
+
+    `window - 1`번째 값은 처음 `window`개의 단순 평균이고, 이후에는
+    `out[i] = (out[i-1] * (window - 1) + x[i]) / window` 입니다 (그 이전 값은 0).
+    `ta`는 이 점화식을 파이썬 for 루프로 계산하지만, 이는 첫 값을 평균으로 바꾼 배열에 대한
+    `alpha = 1 / window` 지수가중 평균과 같으므로 pandas ewm 한 번으로 계산합니다.
+    """
+    out = np.zeros(len(x))
+    if len(x) < window:
+        return out
+    seeded = np.concatenate(([x[:window].mean()], x[window:]))
+    out[window - 1:] = _ewm_mean(seeded, alpha=1.0 / window)
+    return out
+
+
+# `add_indicators`가 추가하는 지표 컬럼 (추가되는 순서).
+INDICATOR_COLS = ("ema_fast", "ema_slow", "rsi", "atr", "macd", "macd_sig", "bb_low", "bb_high")
+
+
 def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
     주어진 OHLCV 데이터프레임에 다양한 기술적 지표를 계산하여 추가합니다.
 
-    `ta` 라이브러리(https://github.com/bukosabino/ta)를 사용하여 다음 지표들을 계산합니다:
+    `ta` 라이브러리(https://github.com/bukosabino/ta)와 같은 정의의 다음 지표들을 계산합니다:
     - EMA (Exponential Moving Average): 지수이동평균. 최근 가격에 더 큰 가중치를 둡니다.
     - RSI (Relative Strength Index): 상대강도지수. 과매수/과매도 상태를 판단하는 데 사용됩니다.
     - ATR (Average True Range): 평균 실제 범위. 가격 변동성을 측정하는 지표입니다.
     - MACD (Moving Average Convergence Divergence): 이동평균 수렴/발산. 추세의 강도와 방향을 나타냅니다.
     - Bollinger Bands: 볼린저 밴드. 이동평균선을 중심으로 표준편차 밴드를 표시하여 변동성을 시각화합니다.
 
+    지표 객체(Series 래퍼)를 만들지 않고 컬럼의 numpy 배열 위에서 직접 계산하며,
+    `ta`의 ATR처럼 파이썬 루프로 계산하던 부분도 pandas ewm 한 번으로 처리합니다.
+
     Args:
         df (pd.DataFrame): 'open', 'high', 'low', 'close', 'volume' 컬럼을 포함하는 OHLCV 데이터프레임.
 
@@ -84,33 +188,160 @@ def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: 원본 데이터프레임에 기술적 지표 컬럼들이 추가된 새로운 데이터프레임.
                       지표 계산으로 인해 초기에 NaN 값을 갖는 행들은 제거됩니다.
     """
-    # 원본 데이터프레임을 수정하지 않기 위해 복사본을 만들어 사용합니다.
-    df = df.copy()
+    # 원본 데이터프레임은 수정하지 않고, 지표 컬럼이 추가된 새 데이터프레임을 만듭니다.
+    # 지표 계산 초기에 발생하는 NaN 값들을 포함한 행은 모두 제거하고 반환합니다.
+    return _with_indicators(df, _indicator_arrays(df))
+
+
+def _with_indicators(df: pd.DataFrame, arrays: dict) -> pd.DataFrame:
+    """`_indicator_arrays`의 결과 중 `INDICATOR_COLS`를 컬럼으로 붙이고 결측치가 있는 행을 제거합니다."""
+    return df.assign(**{col: arrays[col] for col in INDICATOR_COLS}).dropna()
+
+
+def _indicator_arrays(df: pd.DataFrame) -> dict:
+    """`add_indicators`의 지표들을 데이터프레임과 같은 길이의 numpy 배열 딕셔너리로 계산합니다."""
+    close = df["close"].to_numpy(np.float64)
+    high = df["high"].to_numpy(np.float64)
+    low = df["low"].to_numpy(np.float64)
 
     # EMA (지수이동평균) - 단기(12), 장기(26)
     # 추세 추종 지표로, 단기 EMA가 장기 EMA 위에 있으면 상승 추세로 해석합니다.
-    df["ema_fast"] = ta.trend.EMAIndicator(df["close"], window=12).ema_indicator()
-    df["ema_slow"] = ta.trend.EMAIndicator(df["close"], window=26).ema_indicator()
+    ema_fast = _ema(close, 12)
+    ema_slow = _ema(close, 26)
 
     # RSI (상대강도지수) - 14기간
     # 모멘텀 지표로, 보통 70 이상이면 과매수, 30 이하이면 과매도 상태로 봅니다.
-    df["rsi"] = ta.momentum.RSIIndicator(df["close"], window=14).rsi()
+    diff = np.diff(close, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    dn = np.where(diff < 0, -diff, 0.0)
+    ema_up = _ewm_mean(up, alpha=1.0 / 14, min_periods=14)
+    ema_dn = _ewm_mean(dn, alpha=1.0 / 14, min_periods=14)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(ema_dn == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_dn))
 
     # ATR (평균 실제 범위) - 14기간
     # 변동성 지표로, ATR 값이 높을수록 가격 변동성이 크다는 의미입니다. 손절매 거리 계산 등에 활용될 수 있습니다.
-    df["atr"] = ta.volatility.AverageTrueRange(df["high"], df["low"], df["close"], window=14).average_true_range()
+    # True Range = max(고가-저가, |고가-전일종가|, |저가-전일종가|). 첫 행은 전일 종가가 없으므로 고가-저가.
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    atr = _wilder(tr, 14)
 
     # MACD (이동평균 수렴/발산) - 표준 12, 26, 9 설정
     # MACD 선(12-26 EMA 차이)과 시그널 선(MACD의 9 EMA)의 교차를 통해 매매 신호를 포착합니다.
-    macd = ta.trend.MACD(df["close"])
-    df["macd"] = macd.macd()
-    df["macd_sig"] = macd.macd_signal()
+    macd = ema_fast - ema_slow
+    macd_sig = _ema(macd, 9)
 
     # Bollinger Bands (볼린저 밴드) - 20기간, 표준편차 2
     # 가격이 상단 밴드에 닿으면 과매수, 하단 밴드에 닿으면 과매도 상태로 해석될 수 있습니다.
-    bb = ta.volatility.BollingerBands(df["close"], window=20, window_dev=2)
-    df["bb_low"] = bb.bollinger_lband()
-    df["bb_high"] = bb.bollinger_hband()
+    roll = pd.Series(close, copy=False).rolling(20, min_periods=20)
+    mavg = roll.mean().to_numpy()
+    mstd = roll.std(ddof=0).to_numpy()
+
+    # `IndicatorEngine`이 이어서 계산할 수 있도록 RSI의 평균 상승/하락 폭도 함께 반환합니다.
+    return {"ema_fast": ema_fast, "ema_slow": ema_slow, "rsi": rsi, "atr": atr, "macd": macd,
+            "macd_sig": macd_sig, "bb_low": mavg - 2 * mstd, "bb_high": mavg + 2 * mstd,
+            "rsi_up": ema_up, "rsi_dn": ema_dn}
+
+
+class IndicatorEngine:
+    """
+    `add_indicators`와 같은 지표를, 새로 들어온 봉에 대해서만 점화식으로 이어서 계산하는 상태 보존형 계산기.
+
+    입력 데이터의 마지막 행은 아직 진행 중인 봉으로 보고, 그 직전까지 마감된 봉들의 지표 값과
+    마지막 마감 봉 시점의 점화식 상태(EMA, Wilder 평균, 볼린저 밴드용 최근 20개 종가)를 보관합니다.
+    다음 호출에서는 새로 마감된 봉과 진행 중인 봉만 계산하므로, 매 틱마다 전체 기간을 다시 계산하지 않습니다.
+    - EMA: `e = e + α * (x - e)`, `α = 2 / (n + 1)`
+    - RSI 평균 상승/하락 폭, ATR: Wilder 평활 `a = a + (x - a) / 14`
+    - 볼린저 밴드: 최근 20개 종가 창의 평균과 표준편차
+
+    마감된 봉의 연속성이 깨지면(데이터 공백, 캐시 교체 등) `add_indicators`와 같은 전체 계산으로
+    상태를 새로 만듭니다(`seed`). 지수 평균은 계산 시작점의 영향이 빠르게 사라지므로,
+    이어서 계산한 값은 같은 구간을 `add_indicators`로 다시 계산한 값과 워밍업 직후를 제외하면 같습니다.
+    """
+
+    def __init__(self):
+        self._ts = None      # 마감된 봉들의 타임스탬프 (datetime64 배열)
+        self._vals = None    # 마감된 봉들의 지표 값 (행: 봉, 열: `INDICATOR_COLS`)
+        self._state = None   # 마지막 마감 봉 시점의 점화식 상태. None이면 다음 호출에서 `seed`합니다.
+
+    def seed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        전체 구간의 지표를 계산하고, 마지막 행 직전의 마감된 봉까지로 점화식 상태를 초기화합니다.
+
+        Args:
+            df (pd.DataFrame): 'high', 'low', 'close' 컬럼을 포함하는 OHLCV 데이터프레임 (시간순 정렬).
+
+        Returns:
+            pd.DataFrame: `add_indicators(df)`와 같은 결과.
+        """
+        arrays = _indicator_arrays(df)
+        vals = np.column_stack([arrays[col] for col in INDICATOR_COLS])[:-1]
+        ok = ~np.isnan(vals).any(axis=1)
+        self._ts, self._vals = df.index.to_numpy()[:-1][ok], vals[ok]
+
+        # 워밍업이 끝나지 않아 마지막 마감 봉의 상태가 아직 없으면, 다음 호출에서 다시 전체 계산합니다.
+        self._state = None
+        if len(df) > 20 and ok.size and ok[-1]:
+            close = df["close"].to_numpy(np.float64)
+            self._state = {"ema_fast": arrays["ema_fast"][-2], "ema_slow": arrays["ema_slow"][-2],
+                           "macd_sig": arrays["macd_sig"][-2], "up": arrays["rsi_up"][-2],
+                           "dn": arrays["rsi_dn"][-2], "atr": arrays["atr"][-2],
+                           "close": close[-2], "win": close[-21:-1].copy()}
+        return _with_indicators(df, arrays)
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        이전 호출 이후 새로 마감된 봉과 진행 중인 마지막 봉의 지표만 계산하여 붙입니다.
+
+        Args:
+            df (pd.DataFrame): `seed`와 같은 형식의 데이터프레임. 보통 이전 호출의 데이터에서
+                앞쪽이 밀려나고 뒤쪽에 봉이 추가된 최신 구간입니다.
+
+        Returns:
+            pd.DataFrame: 지표 컬럼이 추가된 데이터프레임. 워밍업 구간(지표 값이 없는 앞부분 행)은 제외됩니다.
+        """
+        if self._state is None or len(df) < 2:
+            return self.seed(df)
+        idx = df.index.to_numpy()
+        # 이전에 마지막으로 마감된 봉의 위치. 없거나 그 뒤에 진행 중인 봉이 없으면 처음부터 다시 계산합니다.
+        p = int(idx.searchsorted(self._ts[-1]))
+        if p >= len(idx) - 1 or idx[p] != self._ts[-1]:
+            return self.seed(df)
+
+        high = df["high"].to_numpy(np.float64)
+        low = df["low"].to_numpy(np.float64)
+        close = df["close"].to_numpy(np.float64)
+        # 새로 마감된 봉들은 상태를 갱신하며 기록하고, 보관 행 수는 입력 길이로 제한합니다.
+        st = self._state
+        new = [self._advance(st, high[i], low[i], close[i]) for i in range(p + 1, len(idx) - 1)]
+        if new:
+            self._ts = np.concatenate((self._ts, idx[p + 1:-1]))[-len(idx):]
+            self._vals = np.vstack((self._vals, new))[-len(idx):]
+        # 진행 중인 봉은 상태의 복사본으로 계산하여, 다음 호출에서 같은 봉을 다시 계산할 수 있게 합니다.
+        last = self._advance(dict(st), high[-1], low[-1], close[-1])
+
+        m = min(len(self._vals), len(idx) - 1)
+        if not np.array_equal(self._ts[len(self._ts) - m:], idx[len(idx) - 1 - m:-1]):
+            return self.seed(df)
+        vals = np.vstack((self._vals[len(self._vals) - m:], last))
+        return df.iloc[len(idx) - 1 - m:].assign(**{col: vals[:, j] for j, col in enumerate(INDICATOR_COLS)})
 
-    # 지표 계산 초기에 발생하는 NaN 값들을 포함한 행을 모두 제거하고 반환합니다.
-    return df.dropna()
+    @staticmethod
+    def _advance(st: dict, high: float, low: float, close: float) -> tuple:
+        """봉 하나만큼 점화식 상태 `st`를 갱신하고, 그 봉의 지표 값을 `INDICATOR_COLS` 순서로 반환합니다."""
+        prev = st["close"]
+        d = close - prev
+        st["up"] += (max(d, 0.0) - st["up"]) / 14
+        st["dn"] += (max(-d, 0.0) - st["dn"]) / 14
+        tr = max(high - low, abs(high - prev), abs(low - prev))
+        st["atr"] += (tr - st["atr"]) / 14
+        st["ema_fast"] += (close - st["ema_fast"]) * (2 / 13)
+        st["ema_slow"] += (close - st["ema_slow"]) * (2 / 27)
+        macd = st["ema_fast"] - st["ema_slow"]
+        st["macd_sig"] += (macd - st["macd_sig"]) * (2 / 10)
+        st["close"] = close
+        win = st["win"] = np.append(st["win"][1:], close)
+        mavg, mstd = win.mean(), win.std()
+        rsi = 100.0 if st["dn"] == 0 else 100.0 - 100.0 / (1.0 + st["up"] / st["dn"])
+        return (st["ema_fast"], st["ema_slow"], rsi, st["atr"], macd, st["macd_sig"],
+                mavg - 2 * mstd, mavg + 2 * mstd)
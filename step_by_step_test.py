@@ -6,6 +6,10 @@
 1.  `.env` 파일에 우리가 원하는 설정을 모두 다 적어주세요. (예: 어떤 코인을 거래할지, 레버리지는 몇 배로 할지 등)
 2.  이 파일을 실행하면(터미널에서 `python step_by_step_test.py`),
     아래에 만들어 둔 테스트 함수들이 순서대로 실행되면서 결과를 보여줄 거예요.
+    `python step_by_step_test.py --repl` 로 실행하면, 테스트가 끝난 뒤 파이썬 대화형 창(REPL)이 열려서
+    프로그램을 다시 켜지 않고도 `test_phase_2_1_model_service()` 처럼 원하는 테스트만 다시 불러볼 수 있어요.
+    같은 데이터로 이미 학습한 모델이 있으면 학습을 건너뛰어요. 처음부터 다시 학습하려면 `--retrain` 을 붙여주세요.
+    `.env`에 `FAST_TESTS=true` 를 적어두면, 모델 테스트(2-1) 뒤의 나머지 테스트들을 동시에 돌려서 더 빨리 끝나요.
 3.  마치 의사 선생님이 "숨 크게 쉬어보세요~" 하고 확인하는 것처럼,
     우리도 각 단계의 결과가 우리가 예상한 대로 나왔는지 눈으로 직접 확인하면 됩니다.
 """
@@ -18,10 +22,15 @@ from config.config import CFG
 from main import setup_exchange, setup_services
 # 데이터를 다루는 '판다스'라는 아주 강력한 도구를 가져와요.
 import pandas as pd
+# 숫자 배열을 빠르게 계산해주는 '넘파이'도 가져와요.
+import numpy as np
+# CSV 파일을 여러 스레드로 빠르게 읽어주는 '파이애로우'의 CSV 도구예요.
+import pyarrow as pa
+import pyarrow.csv as pacsv
 # 실제 데이터 리포지토리 클래스를 가져와요. 이걸 흉내내서 가짜 클래스를 만들 거예요.
 from src.data.indicator_repository import IndicatorRepository
-# 기술적 지표를 계산해주는 함수를 가져와요.
-from src.utils.helpers import add_indicators
+# 기술적 지표를 계산해주는 함수와, 로그를 파일/화면에 남기도록 준비해주는 함수를 가져와요.
+from src.utils.helpers import add_indicators, setup_logging
 # ML 모델 서비스를 가져와요.
 from src.model.model_service import ModelService
 # 주문 서비스를 가져와요.
@@ -30,10 +39,21 @@ from src.order.order_service import OrderService
 from src.exchange.exchange_client import ExchangeClient
 # 최종 매매 신호를 생성하는 전략 클래스를 가져와요.
 from src.strategy.strategy import Strategy
+# 가격 경로 전체에서 TP/SL 청산 지점을 한 번에 찾아주는 계산 도구예요.
+from src.bot._fast import first_tp_sl_exit
 # 파일 및 디렉토리 관리를 위한 도구를 가져와요.
+import io
 import os
+import sys
+import time
+import atexit
+import threading
+import code
 import shutil
-from datetime import datetime
+import hashlib
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from concurrent.futures import ThreadPoolExecutor
 
 
 class MockIndicatorRepository(IndicatorRepository):
@@ -52,43 +72,198 @@ class MockIndicatorRepository(IndicatorRepository):
         """
         실제로는 여러 데이터를 합치고 복잡한 계산을 하지만,
         여기서는 그냥 CSV 파일을 읽어서 그 데이터를 반환하는 척할 거예요.
+        CSV 읽기와 지표 계산은 처음 한 번만 하고(`_build_mock_frame`), 그 다음부터는 기억해둔 결과의
+        복사본을 돌려줘요. 그래서 여러 테스트가 불러도 서로의 데이터를 망가뜨리지 않아요.
         """
-        print("   - [알림] 가짜 리포지토리가 'mock_data.csv' 파일에서 데이터를 읽습니다...")
-        # 'mock_data.csv' 파일을 읽어서 데이터프레임으로 만들어요.
-        df = pd.read_csv("mock_data.csv")
-        # 실제 데이터처럼 'timestamp' 컬럼을 날짜/시간 형식으로 바꿔줘요.
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        # 기술적 지표를 계산하는 부분은 진짜와 똑같이 사용해요.
-        df_with_indicators = add_indicators(df)
-
-        # --- 진짜 IndicatorRepository의 병합 로직 흉내내기 ---
-        # ModelService가 "rsi_1h", "ema_fast_4h" 같은 특수한 이름의 컬럼을 찾기 때문에,
-        # 우리도 가짜 데이터에 이 컬럼들을 만들어줘야 해요.
-        # 여기서는 간단하게, 그냥 기본 타임프레임의 지표를 복사해서 이름만 바꿔줄게요.
-        print("   - [알림] 모델 학습에 필요한 멀티-타임프레임 컬럼을 생성합니다...")
-        df_with_indicators["rsi_1h"] = df_with_indicators["rsi"]
-        df_with_indicators["ema_fast_4h"] = df_with_indicators["ema_fast"]
-        df_with_indicators["ema_slow_4h"] = df_with_indicators["ema_slow"]
-
-        # 모델 학습에는 '정답'에 해당하는 'target' 컬럼도 필요해요.
-        # 다음 캔들의 종가가 현재 종가보다 올랐으면 1, 아니면 0으로 표시해요.
-        df_with_indicators["target"] = (df_with_indicators["close"].shift(-1) > df_with_indicators["close"]).astype(int)
-
-        # 실제 코드처럼, 마지막에 NaN 값이 있는 행들은 모두 제거해줘요.
-        return df_with_indicators.dropna()
+        print("   - [알림] 가짜 리포지토리가 'mock_data.csv' 파일의 데이터를 돌려줍니다...")
+        return _build_mock_frame(self.symbol).copy()
 
 
+# 가짜 데이터를 계산한 결과를 파일로 저장해 둘 폴더예요. 다음에 테스트를 다시 실행할 때 재사용해요.
+MOCK_CACHE_DIR = ".cache"
+
+
+@lru_cache(maxsize=1)
+def _mock_data_hash():
+    """
+    'mock_data.csv'와, 저장해 둔 결과에 영향을 주는 코드들의 내용으로 만든 지문(sha1)이에요.
+    - 지표 계산 코드(`src/utils/helpers.py`)
+    - 모델의 피처 목록과 학습 방법(`src/model/model_service.py`)
+    - 이 파일 자신 (정답 컬럼 'target'을 만드는 방법 등)
+    하나라도 바뀌면 지문이 달라지니까, 예전에 저장해 둔 계산 결과나 학습된 모델을 잘못 쓰는 일이 없어요.
+    """
+    h = hashlib.sha1()
+    for fp in ("mock_data.csv", os.path.join("src", "utils", "helpers.py"),
+               os.path.join("src", "model", "model_service.py"), os.path.abspath(__file__)):
+        with open(fp, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _build_mock_frame(symbol):
+    """
+    'mock_data.csv' 파일을 읽고 지표와 정답 컬럼까지 만든 데이터프레임이에요.
+    `lru_cache` 덕분에 같은 심볼로 다시 부르면 파일을 또 읽지 않고 처음 만든 결과를 그대로 돌려줘요.
+    (돌려받은 데이터프레임은 고치지 말고, `.copy()`를 해서 써야 해요.)
+    계산 결과는 `MOCK_CACHE_DIR` 폴더에 Parquet 파일로도 저장해 두어서, 프로그램을 다시 실행해도
+    데이터가 그대로라면 CSV를 다시 읽고 지표를 다시 계산하지 않아요.
+    """
+    cache_fp = os.path.join(MOCK_CACHE_DIR, f"mock_{_mock_data_hash()}.parquet")
+    if os.path.exists(cache_fp):
+        print(f"   - [알림] 저장해 둔 계산 결과('{cache_fp}')를 불러옵니다...")
+        return pd.read_parquet(cache_fp)
+
+    print("   - [알림] 'mock_data.csv' 파일에서 데이터를 읽습니다 (처음 한 번만)...")
+    # 'mock_data.csv' 파일을 읽어서 데이터프레임으로 만들어요.
+    # 파이애로우의 C++ CSV 리더로 읽은 뒤, 컬럼 메모리를 그대로 판다스에 넘겨줘요(복사 최소화).
+    # 칸 수가 모자란 줄(예: 중간에 잘린 마지막 줄)은 어차피 지표 계산 후 NaN으로 지워지니까 읽을 때 건너뛰어요.
+    # 파일은 메모리 맵(`pa.memory_map`)으로 열어서, 운영체제가 캐시해 둔 파일 내용을 따로 복사하지 않고 바로 읽어요.
+    # 1분봉 1년치처럼 파일이 커져도 읽기용 버퍼를 새로 만들지 않아요.
+    parse = pacsv.ParseOptions(invalid_row_handler=lambda row: "skip")
+    with pa.memory_map("mock_data.csv", "r") as src:
+        df = pacsv.read_csv(src, parse_options=parse).to_pandas(split_blocks=True, self_destruct=True)
+    # 실제 데이터처럼 'timestamp' 컬럼을 날짜/시간 형식으로 바꿔줘요.
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    # 기술적 지표를 계산하는 부분은 진짜와 똑같이 사용해요.
+    df_with_indicators = add_indicators(df)
+
+    # --- 진짜 IndicatorRepository의 병합 로직 흉내내기 ---
+    # ModelService가 "rsi_1h", "ema_fast_4h" 같은 특수한 이름의 컬럼을 찾기 때문에,
+    # 우리도 가짜 데이터에 이 컬럼들을 만들어줘야 해요.
+    # 여기서는 간단하게, 그냥 기본 타임프레임의 지표를 복사해서 이름만 바꿔줄게요.
+    # 세 컬럼을 `assign` 한 번으로 같이 붙여요. 원래 배열(`to_numpy()`)을 넘겨서 인덱스 맞추기도 건너뛰어요.
+    print("   - [알림] 모델 학습에 필요한 멀티-타임프레임 컬럼을 생성합니다...")
+    df_with_indicators = df_with_indicators.assign(
+        rsi_1h=df_with_indicators["rsi"].to_numpy(),
+        ema_fast_4h=df_with_indicators["ema_fast"].to_numpy(),
+        ema_slow_4h=df_with_indicators["ema_slow"].to_numpy(),
+    )
+
+    # 모델 학습에는 '정답'에 해당하는 'target' 컬럼도 필요해요.
+    # 다음 캔들의 종가가 현재 종가보다 올랐으면 1, 아니면 0으로 표시해요.
+    # 종가 배열을 한 칸 밀어서 바로 비교하고, 0/1만 담으면 되니까 작은 int8 자료형을 써요.
+    # 마지막 캔들은 '다음 캔들'이 없으니까 0으로 남겨둬요.
+    close = df_with_indicators["close"].to_numpy()
+    target = np.zeros(len(close), dtype=np.int8)
+    np.greater(close[1:], close[:-1], out=target[:-1])
+    df_with_indicators["target"] = target
+
+    # 실제 코드처럼, NaN 값이 있는 행들은 모두 제거해줘요.
+    # 지표의 NaN은 계산이 아직 '예열' 중인 맨 앞쪽 줄에만 생기니까, `dropna()`로 표 전체를 새로 복사하는 대신
+    # 처음으로 모든 값이 채워진 줄부터 잘라서(`iloc`) 원래 표를 그대로 바라보게 해요.
+    # (혹시 중간에 NaN이 있는 줄이 섞여 있으면 그때만 그 줄들을 빼고 골라내요.)
+    valid = df_with_indicators.notna().all(axis=1).to_numpy()
+    first = int(valid.argmax())
+    if valid[first:].all():
+        df_with_indicators = df_with_indicators.iloc[first:]
+    else:
+        df_with_indicators = df_with_indicators[valid]
+
+    # 다음 실행 때 다시 계산하지 않도록 결과를 파일로 저장해 둬요.
+    os.makedirs(MOCK_CACHE_DIR, exist_ok=True)
+    df_with_indicators.to_parquet(cache_fp)
+    return df_with_indicators
+
+
+
+# 예측 결과를 기억해두는 보관함이에요. {(모델 파일, 모델 파일 수정 시각, 데이터 지문): 예측 결과}
+_prob_cache = {}
+
+
+def _cached_add_prob(model, df):
+    """
+    `model.add_prob(df)`와 같은 결과를 돌려주지만, 같은 모델 파일과 같은 데이터로 이미 예측한 적이 있으면
+    다시 예측하지 않고 기억해둔 결과의 복사본을 돌려줘요.
+    여러 테스트가 똑같은 가짜 데이터로 똑같은 모델에게 예측을 시키기 때문에, 두 번째부터는 시간이 거의 안 걸려요.
+    모델 파일이 다시 저장되면(재학습) 수정 시각이 바뀌니까, 그때는 새로 예측해요.
+    """
+    mtime = os.path.getmtime(model.path) if os.path.exists(model.path) else None
+    key = (str(model.path), mtime, len(df), str(df["timestamp"].iloc[-1]), float(df["close"].iloc[-1]))
+    if key not in _prob_cache:
+        _prob_cache[key] = model.add_prob(df)
+    return _prob_cache[key].copy()
+
+# 전략 적용 결과를 기억해두는 보관함이에요. {(데이터 지문, 전략 임계값들): 전략 적용 결과}
+_enrich_cache = {}
+
+
+def _cached_enrich(df):
+    """
+    `Strategy.enrich(df)`와 같은 결과를 돌려주지만, 같은 데이터(길이, 마지막 시각/종가/상승 확률이 같은 표)에
+    이미 전략을 적용한 적이 있으면 다시 계산하지 않고 기억해둔 결과의 복사본을 돌려줘요.
+    전략 규칙은 입력 표와 임계값만 보고 신호를 만들기 때문에, 둘이 같으면 결과도 항상 같아요.
+    """
+    key = (len(df), str(df["timestamp"].iloc[-1]), float(df["close"].iloc[-1]), float(df["prob_up"].iloc[-1]),
+           CFG.BUY_TH, CFG.SELL_TH, CFG.SHORT_TH)
+    if key not in _enrich_cache:
+        _enrich_cache[key] = Strategy.enrich(df)
+    return _enrich_cache[key].copy()
+
+class _PhaseStdout:
+    """
+    화면 출력(`sys.stdout`)을 대신 받아주는 '우체통'이에요.
+    지금 글을 쓰는 스레드가 자기 전용 버퍼를 갖고 있으면 그 버퍼에, 아니면 원래 화면에 글을 보내요.
+    `contextlib.redirect_stdout`은 프로그램 전체의 `sys.stdout`을 바꿔버려서, 여러 테스트를 동시에 돌리면
+    서로의 출력이 뒤섞여요. 이 우체통은 스레드마다 버퍼를 따로 두니까 동시에 돌려도 섞이지 않아요.
+    """
+    def __init__(self, real):
+        self._real = real
+        self._local = threading.local()
+
+    def write(self, text):
+        buf = getattr(self._local, "buf", None)
+        return (self._real if buf is None else buf).write(text)
+
+    def flush(self):
+        if getattr(self._local, "buf", None) is None:
+            self._real.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._real, name)
+
+
+def _buffered_phase(test_fn):
+    """
+    테스트 함수 하나가 화면에 찍는 글들을 바로바로 내보내지 않고 메모리에 모아뒀다가,
+    함수가 끝나면(도중에 실패해도) 한꺼번에 딱 한 번만 화면에 써주는 '포장지'예요.
+    `print()`를 부를 때마다 화면(터미널)에 글을 쓰는 작업이 일어나는데, 한 테스트에서 수십 번씩 반복되면
+    그것만으로도 시간이 꽤 걸려요. 특히 윈도우 명령창이나 CI 로그에서요.
+    버퍼는 스레드마다 따로 두기 때문에(`_PhaseStdout`), 여러 테스트를 동시에 돌려도 출력이 테스트 단위로 깔끔하게 나와요.
+    """
+    @wraps(test_fn)
+    def wrapper(*args, **kwargs):
+        out = sys.stdout
+        if not isinstance(out, _PhaseStdout):
+            out = sys.stdout = _PhaseStdout(out)
+        local = out._local
+        prev, local.buf = getattr(local, "buf", None), io.StringIO()
+        try:
+            return test_fn(*args, **kwargs)
+        finally:
+            text, local.buf = local.buf.getvalue(), prev
+            out.write(text)
+            out.flush()
+    return wrapper
+
 # 파이썬에게 "이 파일이 직접 실행될 때만 아래 코드를 동작시켜줘!" 라고 알려주는 약속이에요.
 # 만약 다른 파일에서 이 파일을 import(가져오기) 할 때는 실행되지 않아요.
 if __name__ == "__main__":
     # 제일 먼저, .env 파일에 적어둔 설정들을 모두 읽어와서 준비해요.
     # 이 한 줄이 없으면, 우리 봇은 어떤 설정을 써야 할지 몰라서 길을 잃게 돼요.
     load_dotenv()
+    # 봇이 남기는 기록(로그)이 파일과 화면에 나오도록 한 번만 준비해요.
+    setup_logging()
+
+    # 모든 테스트가 같이 쓸 '가짜' 데이터 리포지토리를 딱 하나만 만들어 둬요.
+    # 테스트마다 새로 만들 필요가 없고, 데이터도 한 번 읽어둔 것을 계속 재사용해요.
+    REPO = MockIndicatorRepository(symbol=CFG.SYMBOL)
 
     # === Phase 1: 환경 설정 및 데이터 검증 (가장 기본) ===
     # 집을 짓기 전에 땅이 튼튼한지, 설계도는 잘 나왔는지 확인하는 단계예요.
     # 봇이 제대로 달리려면, 가장 기본적인 환경과 데이터가 완벽해야 해요.
 
+    @_buffered_phase
     def test_phase_1_1_config_values():
         """
         [테스트 1-1: 설정 값 검증]
@@ -146,10 +321,8 @@ if __name__ == "__main__":
 
     # --- 여기서부터 테스트를 실제로 실행하는 부분이에요 ---
 
-    # 위에서 만든 '설정 값 검증' 테스트 함수를 실행해요.
-    test_phase_1_1_config_values()
-
-    def test_phase_1_2_data_and_indicators():
+    @_buffered_phase
+    def test_phase_1_2_data_and_indicators(repo=REPO):
         """
         [테스트 1-2: 데이터 수집 및 지표 계산 검증]
         봇의 판단의 근거가 되는 '데이터'가 신선하고 정확한지 확인하는 단계예요.
@@ -169,8 +342,7 @@ if __name__ == "__main__":
         # 3. 가져온 데이터가 최신인지, 그리고 각종 지표들이 숫자로 잘 계산되었는지 출력해서 확인합니다.
 
         print("1. '가짜' 데이터 리포지토리(MockIndicatorRepository)를 준비합니다...")
-        # 진짜 거래소에 접속하는 대신, 가짜 리포지토리를 생성해요.
-        repo = MockIndicatorRepository(symbol=CFG.SYMBOL)
+        # 진짜 거래소에 접속하는 대신, 미리 만들어 둔 가짜 리포지토리(REPO)를 사용해요.
         print("   - 준비 완료!")
         print("-" * 20)
 
@@ -201,10 +373,8 @@ if __name__ == "__main__":
         print("✅ [성공] 데이터 수집 및 지표 계산이 올바르게 수행된 것을 확인했습니다.")
         print("="*60, "\n")
 
-    # 위에서 만든 '데이터 및 지표 검증' 테스트 함수를 실행해요.
-    test_phase_1_2_data_and_indicators()
-
-    def test_phase_2_1_model_service():
+    @_buffered_phase
+    def test_phase_2_1_model_service(repo=REPO):
         """
         [테스트 2-1: 머신러닝 모델 단위 테스트]
         봇의 두뇌 역할을 하는 ML 모델이 스스로 학습하고, 예측하는 기능을 잘 수행하는지 확인해요.
@@ -225,27 +395,48 @@ if __name__ == "__main__":
         # 5. 학습된 모델에게 예측을 시켜보고, 결과가 정상적인지(0과 1 사이의 확률값) 확인합니다.
 
         print("1. 테스트 환경을 준비합니다...")
-        # 'models' 라는 폴더가 이미 있다면, 깨끗한 테스트를 위해 폴더 안의 모든 것을 지워요.
-        if os.path.exists(CFG.MODEL_DIR):
-            shutil.rmtree(CFG.MODEL_DIR)
-            print(f"   - 기존 '{CFG.MODEL_DIR}' 폴더를 삭제했습니다.")
-        # 모델을 저장할 폴더를 새로 만들어요.
-        os.makedirs(CFG.MODEL_DIR)
-        print(f"   - 새 '{CFG.MODEL_DIR}' 폴더를 생성했습니다.")
+        # 학습은 이 파일에서 가장 오래 걸리는 일이에요. 그래서 모델을 저장할 때 '어떤 데이터로 학습했는지'
+        # 지문을 옆 파일(.hash)에 같이 적어두고, 다음 실행 때 지문이 같으면 학습을 건너뛰고 그 모델을 다시 써요.
+        # 꼭 처음부터 다시 학습시키고 싶다면 `--retrain` 옵션을 붙여서 실행하면 돼요.
+        hash_fp = f"{CFG.MODEL_FP}.hash"
+        data_hash = _mock_data_hash()
+        reuse = False
+        if "--retrain" not in sys.argv and os.path.exists(CFG.MODEL_FP) and os.path.exists(hash_fp):
+            with open(hash_fp) as f:
+                reuse = f.read().strip() == data_hash
+        if reuse:
+            print(f"   - 같은 데이터로 학습한 모델이 이미 있어서 '{CFG.MODEL_DIR}' 폴더를 그대로 사용합니다.")
+        else:
+            # 'models' 라는 폴더가 이미 있다면, 깨끗한 테스트를 위해 폴더를 치워요.
+            # 파일을 하나하나 지우는 대신 폴더 이름만 '휴지통' 이름으로 한 번에 바꿔두고(`os.replace`),
+            # 실제로 지우는 일은 프로그램이 끝날 때(`atexit`) 해요. 윈도우에서는 하나하나 지우는 게 특히 느리거든요.
+            if os.path.exists(CFG.MODEL_DIR):
+                trash = f"{CFG.MODEL_DIR}.trash.{os.getpid()}.{time.time_ns()}"
+                os.replace(CFG.MODEL_DIR, trash)
+                atexit.register(shutil.rmtree, trash, ignore_errors=True)
+                print(f"   - 기존 '{CFG.MODEL_DIR}' 폴더를 치웠습니다.")
+            # 모델을 저장할 폴더를 새로 만들어요.
+            os.makedirs(CFG.MODEL_DIR)
+            print(f"   - 새 '{CFG.MODEL_DIR}' 폴더를 생성했습니다.")
         print("-" * 20)
 
         print("2. 모델 학습에 사용할 데이터를 준비합니다...")
         # 이전 테스트에서 사용했던 가짜 데이터 리포지토리를 다시 사용해요.
-        mock_repo = MockIndicatorRepository(symbol=CFG.SYMBOL)
-        df_train = mock_repo.get_merged()
+        df_train = repo.get_merged()
         print(f"   - {len(df_train)} 줄의 학습 데이터를 준비했습니다.")
         print("-" * 20)
 
         print("3. 모델 서비스를 생성하고 학습을 시작합니다...")
         # 모델 서비스를 생성해요. CFG.MODEL_FP는 모델이 저장될 파일 경로예요.
         model = ModelService(CFG.MODEL_FP)
-        # 학습 시작! 이 과정은 컴퓨터 성능에 따라 약간의 시간이 걸릴 수 있어요.
-        model.train(df_train)
+        if reuse:
+            print("   - 저장된 모델을 불러왔으므로 학습을 건너뜁니다. (다시 학습하려면 --retrain)")
+        else:
+            # 학습 시작! 이 과정은 컴퓨터 성능에 따라 약간의 시간이 걸릴 수 있어요.
+            model.train(df_train)
+            # 이번 학습에 쓴 데이터의 지문을 모델 옆에 적어둬요.
+            with open(hash_fp, "w") as f:
+                f.write(data_hash)
         print("-" * 20)
 
         print("4. 학습된 모델 파일이 잘 저장되었는지 확인합니다...")
@@ -257,13 +448,15 @@ if __name__ == "__main__":
 
         print("5. 학습된 모델로 예측을 수행하고 결과를 확인합니다...")
         # 학습에 사용했던 데이터로 예측을 수행해요.
-        df_pred = model.add_prob(df_train)
+        df_pred = _cached_add_prob(model, df_train)
         # 'prob_up' 컬럼이 새로 추가되었는지 확인해요.
         assert 'prob_up' in df_pred.columns, "예측 후 'prob_up' 컬럼이 추가되지 않았습니다!"
         print("   - 'prob_up' 컬럼이 성공적으로 추가되었습니다.")
 
         # 예측된 확률 값들이 0과 1 사이에 있는지 확인해요. 확률은 이 범위를 벗어날 수 없으니까요.
-        is_prob_valid = df_pred['prob_up'].between(0, 1).all()
+        # 판다스 Series를 새로 만들지 않고 넘파이 배열에서 바로 비교해요. (NaN은 두 비교가 모두 거짓이라 여기서 걸러져요.)
+        p = df_pred['prob_up'].to_numpy()
+        is_prob_valid = np.logical_and(p >= 0, p <= 1).all()
         assert is_prob_valid, "예측된 확률값이 0과 1 사이의 범위를 벗어났습니다!"
         print("   - 예측된 확률 값들이 모두 0과 1 사이의 유효한 값입니다.")
         print("   - 아래는 예측 결과의 마지막 5줄입니다.")
@@ -273,17 +466,19 @@ if __name__ == "__main__":
         print("✅ [성공] 모델의 학습, 저장, 예측 기능이 모두 올바르게 수행된 것을 확인했습니다.")
         print("="*60, "\n")
 
-    # 위에서 만든 '모델 서비스 검증' 테스트 함수를 실행해요.
-    test_phase_2_1_model_service()
-
     class MockExchange(ExchangeClient):
         """
         실제 거래소에 주문을 보내는 대신, 어떤 주문이 들어왔는지 기록만 하는 '가짜' 거래소 클라이언트예요.
         이걸 사용하면 실제 돈이나 API 키 없이도 주문 로직을 안전하게 테스트할 수 있어요.
         """
-        def __init__(self):
-            # 이 리스트에 들어온 주문들을 차곡차곡 기록할 거예요.
-            self.orders = []
+        # 주문 한 건을 기록할 '칸'들의 모양이에요. 주문마다 딕셔너리를 새로 만드는 대신,
+        # 미리 만들어 둔 넘파이 표(구조화 배열)의 다음 줄에 값만 채워 넣어요.
+        ORDER_DTYPE = np.dtype([("symbol", "U16"), ("side", "U4"), ("qty", "f8"), ("price", "f8"), ("type", "U6")])
+
+        def __init__(self, capacity=1024):
+            # 이 표에 들어온 주문들을 차곡차곡 기록할 거예요. 실제로 기록된 주문 수는 `self.n` 이에요.
+            self.orders = np.empty(capacity, dtype=self.ORDER_DTYPE)
+            self.n = 0
             # 실제 ExchangeClient는 내부에 ccxt 클라이언트 객체를 'client' 속성으로 가지고 있어요.
             # 우리 가짜 객체도 똑같은 구조를 갖도록 자기 자신을 'client'로 설정해요.
             self.client = self
@@ -291,11 +486,17 @@ if __name__ == "__main__":
         def get_name(self):
             return "MockExchange"
 
+        def _record_order(self, symbol, side, qty, price, order_type):
+            # 표가 꽉 차면 두 배로 늘려요. 그다음 비어있는 다음 줄에 주문을 적어요.
+            if self.n == len(self.orders):
+                self.orders = np.resize(self.orders, 2 * len(self.orders))
+            self.orders[self.n] = (symbol, side, qty, price, order_type)
+            self.n += 1
+
         def create_market_order(self, symbol, side, qty):
             # 시장가 주문을 기록해요.
             print(f"   - [가짜 거래소] 시장가 주문 접수: {symbol}, {side}, 수량 {qty}")
-            order = {"symbol": symbol, "side": side, "qty": qty, "type": "market"}
-            self.orders.append(order)
+            self._record_order(symbol, side, qty, 0.0, "market")
             # 실제 주문처럼 주문 정보를 담은 딕셔너리를 반환해요.
             return {"price": 50000 * 1.0005} # 슬리피지가 적용된 것처럼 가짜 체결가를 반환
 
@@ -303,9 +504,8 @@ if __name__ == "__main__":
             # TP/SL 주문을 기록해요.
             order_type = "TP" if tp else "SL"
             print(f"   - [가짜 거래소] {order_type} 주문 접수: {symbol}, {side}, 수량 {qty}, 가격 {price}")
-            order = {"symbol": symbol, "side": side, "qty": qty, "price": price, "type": order_type}
-            self.orders.append(order)
-            return order
+            self._record_order(symbol, side, qty, price, order_type)
+            return {"symbol": symbol, "side": side, "qty": qty, "price": price, "type": order_type}
 
         def set_leverage(self, symbol, leverage, isolated):
             # 레버리지 설정 요청을 받았다고 로그만 남겨요.
@@ -320,6 +520,12 @@ if __name__ == "__main__":
         def fetch_ohlcv(self, symbol, timeframe, since, limit):
             return [] # 그냥 비어있는 리스트를 반환해요.
 
+        async def fetch_ohlcv_async(self, symbol, timeframe, since=None, limit=500):
+            return [] # 비동기 조회도 비어있는 리스트를 반환해요.
+
+        async def watch_ohlcv(self, symbol, timeframe):
+            return [] # 웹소켓 구독도 흉내만 내요.
+
         def fetch_position(self, symbol):
             return None # 포지션이 없다고 알려줘요.
 
@@ -330,6 +536,7 @@ if __name__ == "__main__":
             return price # 가격을 그대로 돌려줘요.
 
 
+    @_buffered_phase
     def test_phase_2_2_order_service():
         """
         [테스트 2-2: 주문 관리 단위 테스트]
@@ -356,15 +563,13 @@ if __name__ == "__main__":
         print("3. 손절/익절 주문이 거래소로 잘 전송되었는지 확인합니다...")
         # 가짜 거래소에 기록된 주문 목록을 확인해요.
         # 주문은 총 3개여야 해요: (1)시장가 진입, (2)TP 주문, (3)SL 주문
-        assert len(mock_exchange.orders) == 3, f"시장가, TP, SL 포함 총 3개의 주문이 기록되어야 하는데, {len(mock_exchange.orders)}개만 기록되었습니다."
+        assert mock_exchange.n == 3, f"시장가, TP, SL 포함 총 3개의 주문이 기록되어야 하는데, {mock_exchange.n}개만 기록되었습니다."
         print("   - ✅ 성공: 총 3개의 주문(시장가, TP, SL)이 정상적으로 접수되었습니다.")
 
-        # 각 주문의 상세 내역을 확인해요.
-        market_order = mock_exchange.orders[0]
-        tp_order = mock_exchange.orders[1]
-        sl_order = mock_exchange.orders[2]
+        # 각 주문의 상세 내역을 확인해요. 표의 각 줄은 `order['type']` 처럼 칸 이름으로 읽을 수 있어요.
+        market_order, tp_order, sl_order = mock_exchange.orders[:mock_exchange.n]
 
-        assert market_order['type'] == 'market' and market_order['side'] == 'buy'
+        assert market_order['type'] == 'market' and market_order['side'] == 'BUY'
         print("   - ✅ 성공: 첫 번째 주문은 '시장가 매수(buy)'가 맞습니다.")
 
         assert tp_order['type'] == 'TP' and tp_order['side'] == 'SELL'
@@ -382,39 +587,67 @@ if __name__ == "__main__":
         order_service_paper = OrderService(MockExchange(), paper=True, init_balance=10000)
         print("-" * 20)
 
-        print("2. 롱 포지션 진입을 요청합니다...")
-        order_service_paper.open_position(px=50000, qty=0.1, side="long")
-        entry_price = order_service_paper.pos['entry']
-        print(f"   - 포지션 진입 완료. (진입가: {entry_price})")
-        print("-" * 20)
-
-        print("3. 가격이 손절(SL) 라인에 도달한 상황을 시뮬레이션합니다...")
-        # SL 가격 = 진입가 * (1 - 0.02) = 50025 * 0.98 = 49024.5
-        sl_price = entry_price * (1 - CFG.SL_PCT)
-        order_service_paper.poll_position_closed(sl_price * 0.999) # 살짝 더 아래 가격으로 테스트
-        assert order_service_paper.pos is None, "손절 후 포지션이 청산되지 않았습니다."
-        print(f"   - ✅ 성공: 현재가가 SL 가격({sl_price:.2f})에 도달하자 포지션이 자동으로 청산되었습니다.")
-        print(f"   - 현재 잔고: {order_service_paper.balance:.2f} (손실 반영)")
-        print("-" * 20)
-
-        print("4. 다시 진입 후, 가격이 익절(TP) 라인에 도달한 상황을 시뮬레이션합니다...")
-        order_service_paper.open_position(px=50000, qty=0.1, side="long")
-        entry_price = order_service_paper.pos['entry']
-        tp_price = entry_price * (1 + CFG.TP_PCT)
-        order_service_paper.poll_position_closed(tp_price * 1.001) # 살짝 더 위 가격으로 테스트
-        assert order_service_paper.pos is None, "익절 후 포지션이 청산되지 않았습니다."
-        print(f"   - ✅ 성공: 현재가가 TP 가격({tp_price:.2f})에 도달하자 포지션이 자동으로 청산되었습니다.")
-        print(f"   - 현재 잔고: {order_service_paper.balance:.2f} (수익 반영)")
+        # 손절(SL)과 익절(TP)은 '목표 가격'만 다르고 확인하는 순서는 똑같아요.
+        # 그래서 표 한 줄에 한 가지 상황씩 적어두고, 같은 순서로 차례대로 확인해요.
+        # (예: SL 가격 = 진입가 * (1 - 0.02) = 50025 * 0.98 = 49024.5)
+        cases = [
+            # (이름, 한글 이름, 잔고 변화, 진입가 대비 목표 가격 배율, 목표 가격을 살짝 넘기는 배율)
+            ("SL", "손절", "손실", 1 - CFG.SL_PCT, 0.999),  # 살짝 더 아래 가격으로 테스트
+            ("TP", "익절", "수익", 1 + CFG.TP_PCT, 1.001),  # 살짝 더 위 가격으로 테스트
+        ]
+        for step, (label, name, effect, mult, jitter) in enumerate(cases, start=2):
+            print(f"{step}. 롱 포지션에 진입한 뒤, 가격이 {name}({label}) 라인에 도달한 상황을 시뮬레이션합니다...")
+            order_service_paper.open_position(px=50000, qty=0.1, side="long")
+            entry_price = order_service_paper.pos.entry
+            print(f"   - 포지션 진입 완료. (진입가: {entry_price})")
+            target_price = entry_price * mult
+            order_service_paper.poll_position_closed(target_price * jitter)
+            assert order_service_paper.pos is None, f"{name} 후 포지션이 청산되지 않았습니다."
+            print(f"   - ✅ 성공: 현재가가 {label} 가격({target_price:.2f})에 도달하자 포지션이 자동으로 청산되었습니다.")
+            print(f"   - 현재 잔고: {order_service_paper.balance:.2f} ({effect} 반영)")
+            print("-" * 20)
+
+        print(f"{len(cases) + 2}. 실제 가격 흐름(가짜 데이터의 종가)을 따라가며 포지션이 청산되는 지점을 확인합니다...")
+        # 첫 종가에 롱으로 진입한 뒤, 그 다음 종가들을 시간 순서대로 하나씩 현재가로 넣어봐요.
+        path = _build_mock_frame(CFG.SYMBOL)["close"].to_numpy()
+        order_service_paper.open_position(px=float(path[0]), qty=0.1, side="long")
+        entry_price = order_service_paper.pos.entry
+        tp_price, sl_price = entry_price * (1 + CFG.TP_PCT), entry_price * (1 - CFG.SL_PCT)
+        exit_i = -1
+        if CFG.FAST_TESTS:
+            # 빠른 테스트 모드: 틱마다 주문 서비스를 부르지 않고, 넘파이 계산 도구로 가격 흐름 전체를 한 번에 훑어서
+            # 처음 TP/SL에 닿는 지점을 찾은 다음, 그 가격으로만 주문 서비스를 한 번 불러요.
+            hit = first_tp_sl_exit(path[1:], 1, tp_price, sl_price)
+            if hit >= 0:
+                exit_i = hit + 1
+                order_service_paper.poll_position_closed(float(path[exit_i]))
+        else:
+            # 기본 모드: 실제 봇처럼 가격이 들어올 때마다 주문 서비스에게 청산 여부를 물어봐요.
+            for j in range(1, len(path)):
+                order_service_paper.poll_position_closed(float(path[j]))
+                if order_service_paper.pos is None:
+                    exit_i = j
+                    break
+        if exit_i < 0:
+            print(f"   - 정보: 이번 가격 흐름({len(path)}개)에서는 TP({tp_price:.2f})/SL({sl_price:.2f})에 닿지 않았습니다.")
+        else:
+            exit_price = path[exit_i]
+            assert order_service_paper.pos is None, "TP/SL에 닿았는데 포지션이 청산되지 않았습니다."
+            assert exit_price >= tp_price or exit_price <= sl_price, "청산 가격이 TP/SL 범위를 넘지 않았습니다."
+            # 청산 지점 전까지의 가격은 모두 SL과 TP 사이에 있어야 해요. (더 일찍 청산됐어야 하는 지점이 없어야 해요.)
+            before = path[1:exit_i]
+            assert ((before > sl_price) & (before < tp_price)).all(), "더 이른 청산 지점을 놓쳤습니다."
+            kind = "TP" if exit_price >= tp_price else "SL"
+            print(f"   - ✅ 성공: {exit_i}번째 가격({exit_price:.2f})에서 {kind}에 닿아 포지션이 청산되었습니다.")
+            print(f"   - 현재 잔고: {order_service_paper.balance:.2f}")
         print("\n")
 
         print("✅ [성공] 주문 서비스가 실전/모의 환경 모두에서 올바르게 작동하는 것을 확인했습니다.")
         print("="*60, "\n")
 
 
-    # 위에서 만든 '주문 서비스 검증' 테스트 함수를 실행해요.
-    test_phase_2_2_order_service()
-
-    def test_phase_2_3_strategy():
+    @_buffered_phase
+    def test_phase_2_3_strategy(repo=REPO):
         """
         [테스트 2-3: 전략 및 신호 생성 통합 테스트]
         데이터, 모델 예측, 전략 규칙이 모두 합쳐져서 최종 매매 신호가 올바르게 생성되는지 확인해요.
@@ -434,36 +667,43 @@ if __name__ == "__main__":
         # 4. short 신호에 대해서도 동일하게 검증합니다.
 
         print("1. 테스트에 필요한 데이터와 모델을 준비합니다...")
-        mock_repo = MockIndicatorRepository(CFG.SYMBOL)
         model = ModelService(CFG.MODEL_FP) # 이전에 학습/저장된 모델을 불러와요.
-        df = mock_repo.get_merged()
-        df_with_prob = model.add_prob(df)
+        df = repo.get_merged()
+        # 테스트 2-1에서 같은 모델로 같은 데이터를 이미 예측했으니, 기억해둔 결과를 그대로 써요.
+        df_with_prob = _cached_add_prob(model, df)
         print("   - 준비 완료!")
         print("-" * 20)
 
         print("2. 전략을 적용하여 최종 신호를 생성합니다...")
-        df_final = Strategy.enrich(df_with_prob)
+        # 같은 데이터에 이미 전략을 적용한 적이 있으면(예: REPL에서 이 테스트를 다시 부를 때) 기억해둔 결과를 써요.
+        df_final = _cached_enrich(df_with_prob)
         print("   - 최종 신호 생성 완료!")
         print("-" * 20)
 
+        # 검사에 쓸 컬럼들을 넘파이 배열로 한 번만 꺼내둬요. 이렇게 하면 검사할 때마다
+        # 판다스가 중간 결과(Series)를 새로 만들지 않아서 훨씬 가벼워요.
+        prob = df_final['prob_up'].to_numpy()
+
         print("3. 'long' 신호가 발생한 지점들을 검증합니다...")
-        long_signals = df_final[df_final['long']]
-        if not long_signals.empty:
+        long_mask = df_final['long'].to_numpy()
+        n_long = int(long_mask.sum())
+        if n_long:
             # long 신호가 하나라도 있다면, 그 신호들의 모든 'rule_long' 컬럼 값은 True여야만 해요.
-            assert long_signals['rule_long'].all(), "'long' 신호가 나왔지만 'rule_long'이 False인 경우가 있습니다."
+            assert df_final['rule_long'].to_numpy()[long_mask].all(), "'long' 신호가 나왔지만 'rule_long'이 False인 경우가 있습니다."
             # 또한, 'prob_up'은 BUY_TH 임계값보다 커야 해요.
-            assert (long_signals['prob_up'] > CFG.BUY_TH).all(), f"'long' 신호가 나왔지만 상승 확률이 {CFG.BUY_TH} 이하인 경우가 있습니다."
-            print(f"   - ✅ 성공: 총 {len(long_signals)}개의 'long' 신호 모두가 'rule_long'과 'prob_up > {CFG.BUY_TH}' 조건을 만족했습니다.")
+            assert (prob[long_mask] > CFG.BUY_TH).all(), f"'long' 신호가 나왔지만 상승 확률이 {CFG.BUY_TH} 이하인 경우가 있습니다."
+            print(f"   - ✅ 성공: 총 {n_long}개의 'long' 신호 모두가 'rule_long'과 'prob_up > {CFG.BUY_TH}' 조건을 만족했습니다.")
         else:
             print("   - 정보: 이번 테스트 데이터에서는 'long' 신호가 발생하지 않았습니다.")
         print("-" * 20)
 
         print("4. 'short' 신호가 발생한 지점들을 검증합니다...")
-        short_signals = df_final[df_final['short']]
-        if not short_signals.empty:
-            assert short_signals['rule_short'].all(), "'short' 신호가 나왔지만 'rule_short'이 False인 경우가 있습니다."
-            assert (short_signals['prob_up'] < CFG.SHORT_TH).all(), f"'short' 신호가 나왔지만 상승 확률이 {CFG.SHORT_TH} 이상인 경우가 있습니다."
-            print(f"   - ✅ 성공: 총 {len(short_signals)}개의 'short' 신호 모두가 'rule_short'과 'prob_up < {CFG.SHORT_TH}' 조건을 만족했습니다.")
+        short_mask = df_final['short'].to_numpy()
+        n_short = int(short_mask.sum())
+        if n_short:
+            assert df_final['rule_short'].to_numpy()[short_mask].all(), "'short' 신호가 나왔지만 'rule_short'이 False인 경우가 있습니다."
+            assert (prob[short_mask] < CFG.SHORT_TH).all(), f"'short' 신호가 나왔지만 상승 확률이 {CFG.SHORT_TH} 이상인 경우가 있습니다."
+            print(f"   - ✅ 성공: 총 {n_short}개의 'short' 신호 모두가 'rule_short'과 'prob_up < {CFG.SHORT_TH}' 조건을 만족했습니다.")
         else:
             print("   - 정보: 이번 테스트 데이터에서는 'short' 신호가 발생하지 않았습니다.")
         print("\n")
@@ -472,9 +712,7 @@ if __name__ == "__main__":
         print("="*60, "\n")
 
 
-    # 위에서 만든 '전략 검증' 테스트 함수를 실행해요.
-    test_phase_2_3_strategy()
-
+    @_buffered_phase
     def test_phase_2_4_risk_management():
         """
         [테스트 2-4: 리스크 관리 기능 검증]
@@ -499,12 +737,15 @@ if __name__ == "__main__":
         print("-" * 20)
 
         print("2. 일부러 손실을 3번 연속으로 발생시킵니다...")
-        # CFG.MAX_LOSS 에 설정된 횟수만큼 반복해요.
+        # CFG.MAX_LOSS 에 설정된 횟수만큼, 같은 주문 서비스로 진입과 청산을 반복해요.
+        # 진짜 `open_position`/`poll_position_closed`를 거쳐야 손익 계산과 거래 중단 로직까지 함께 확인할 수 있어요.
+        # (빠른 테스트 모드에서는 회차별 안내 문구만 생략해요.)
         for i in range(CFG.MAX_LOSS):
-            print(f"   - 손실 발생 시도 ({i+1}/{CFG.MAX_LOSS})...")
+            if not CFG.FAST_TESTS:
+                print(f"   - 손실 발생 시도 ({i+1}/{CFG.MAX_LOSS})...")
             # 롱 포지션에 진입하자마자
             order_service.open_position(px=50000, qty=0.1, side="long")
-            entry_price = order_service.pos['entry']
+            entry_price = order_service.pos.entry
             # 바로 손절 가격으로 청산시켜서 손실을 만들어요.
             sl_price = entry_price * (1 - CFG.SL_PCT)
             order_service.poll_position_closed(sl_price)
@@ -516,7 +757,9 @@ if __name__ == "__main__":
         assert order_service.is_paused(), "연속 손실 후에도 거래가 중단되지 않았습니다."
         print("   - ✅ 성공: is_paused()가 True를 반환했습니다.")
         # pause_until 변수에는 미래의 시간이 기록되어 있어야 해요.
-        assert order_service.pause_until > datetime.utcnow(), "거래 중단 시간이 올바르게 설정되지 않았습니다."
+        # 지금 시각(UTC)은 한 번만 읽어두고 비교해요. pause_until도 UTC 시각이라 그대로 비교할 수 있어요.
+        now = datetime.now(timezone.utc)
+        assert order_service.pause_until > now, "거래 중단 시간이 올바르게 설정되지 않았습니다."
         print(f"   - ✅ 성공: 거래 중단이 {order_service.pause_until} 까지 설정되었습니다.")
         print("\n")
 
@@ -524,7 +767,33 @@ if __name__ == "__main__":
         print("="*60, "\n")
 
 
-    # 위에서 만든 '리스크 관리 검증' 테스트 함수를 실행해요.
-    test_phase_2_4_risk_management()
-
     # (다음 테스트는 여기에 추가될 예정입니다...)
+
+    # === 위에서 만든 테스트 함수들을 실행해요 ===
+    if CFG.FAST_TESTS:
+        # 빠른 테스트 모드: 모델 파일을 만드는 테스트 2-1만 먼저 돌리고,
+        # 나머지는 서로 기다릴 필요가 없으니 스레드 4개로 동시에 돌려요.
+        # 판다스/넘파이는 무거운 계산을 하는 동안 GIL을 놓아주기 때문에, 전체 시간이 가장 느린 테스트 하나의 시간에 가까워져요.
+        # (출력은 테스트가 끝나는 순서대로 테스트 단위로 나와요.)
+        test_phase_2_1_model_service()
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            list(ex.map(lambda test: test(), [
+                test_phase_1_1_config_values,
+                test_phase_1_2_data_and_indicators,
+                test_phase_2_2_order_service,
+                test_phase_2_3_strategy,
+                test_phase_2_4_risk_management,
+            ]))
+    else:
+        # 기본 모드: 가장 기본적인 것부터 차례차례 하나씩 확인해요.
+        test_phase_1_1_config_values()         # 설정 값 검증
+        test_phase_1_2_data_and_indicators()   # 데이터 및 지표 검증
+        test_phase_2_1_model_service()         # 모델 서비스 검증
+        test_phase_2_2_order_service()         # 주문 서비스 검증
+        test_phase_2_3_strategy()              # 전략 검증
+        test_phase_2_4_risk_management()       # 리스크 관리 검증
+
+    # `--repl` 옵션을 붙여 실행했다면, 테스트에서 쓴 도구들(가짜 거래소, 서비스 클래스, 테스트 함수들)을
+    # 그대로 가진 대화형 창을 열어줘요. 무거운 라이브러리를 다시 불러오지 않고 바로 이것저것 시험해볼 수 있어요.
+    if "--repl" in sys.argv:
+        code.interact(banner="step_by_step_test REPL (종료: Ctrl-D)", local={**globals(), **locals()})